@@ -1,20 +1,29 @@
 import os
 import sys
 import platform
-import threading
 import asyncio
+from http.cookies import SimpleCookie
+from typing import Dict
 from fastapi import FastAPI, Request, UploadFile, Depends, Form, HTTPException, status, Response
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import socketio
-from pydub import AudioSegment
 import speech_recognition as sr
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from db.models import get_db, HistorialInteraccion, Usuario
-from servicios.historial_service import HistorialService
+from db.models import get_db_lectura, get_async_db, get_async_db_lectura, AsyncSessionLectura, async_engine, async_engine_lectura, inicializar_bd, HistorialInteraccion, Usuario
+from servicios.historial_service import HistorialService, HISTORIAL_PAGINA
 from servicios.auth_service import AuthService
+from servicios.audio_service import AudioService, AudioDemasiadoLargoError
+from servicios.ejecutores import cerrar_ejecutores
+from servicios.admision_service import ControlAdmision, SaturadoError
+from servicios.ejecutor_comandos import EjecutorComandos, ComandoExpiradoError
+from servicios.voz_service import VozService
+from servicios.wikipedia_service import cache_wikipedia
+from servicios.asr_service import obtener_motor, latencias_asr, ASR_MOTOR
+from servicios.transcripcion_service import TranscripcionService, ErrorConversionAudio, cache_transcripciones
+from servicios.streaming_service import SesionStreaming, especulacion, parciales
 from funciones.comandos import ejecutar_comando
 
 
@@ -46,6 +55,27 @@ print("=" * 50)
 app = FastAPI()
 sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
 
+# Control de admisión de /audio: transcripciones simultáneas y cola de espera
+control_audio = ControlAdmision(
+    max_en_curso=int(os.getenv("AUDIO_MAX_EN_CURSO", 4)),
+    max_en_cola=int(os.getenv("AUDIO_MAX_EN_COLA", 8)),
+    espera_max=float(os.getenv("AUDIO_ESPERA_MAX", 5))
+)
+
+# Pool supervisado para ejecutar los comandos reconocidos
+ejecutor_comandos = EjecutorComandos()
+
+# Límites de los comandos escritos (/comando y /comandos)
+COMANDO_MAX_CARACTERES = 500
+COMANDOS_MAX_LOTE = int(os.getenv("COMANDOS_MAX_LOTE", 16))
+
+def respuesta_saturado(e: SaturadoError) -> JSONResponse:
+    return JSONResponse(
+        {"error": str(e)},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(e.reintentar_en)}
+    )
+
 # Montar carpeta de templates y estáticos
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -65,9 +95,9 @@ async def verificar_autenticacion(request: Request, call_next):
         return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
     
     try:
-        # Verificar que el usuario existe
-        db = next(get_db())
-        usuario = AuthService.obtener_usuario_por_id(db, int(usuario_id))
+        # Verificar que el usuario existe (sesión asíncrona de solo lectura: no bloquea el event loop)
+        async with AsyncSessionLectura() as db:
+            usuario = await AuthService.obtener_usuario_por_id_async(db, int(usuario_id))
         if not usuario:
             response = RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
             response.delete_cookie("usuario_id")
@@ -79,14 +109,25 @@ async def verificar_autenticacion(request: Request, call_next):
     
     # Agregar usuario_id al estado de la solicitud
     request.state.usuario_id = int(usuario_id)
+
+    # Rechazar audio nuevo antes de leer el cuerpo si es demasiado grande o ya no cabe en la cola
+    if request.url.path == "/audio" and request.method == "POST":
+        try:
+            AudioService.comprobar_longitud(request.headers.get("content-length"))
+            control_audio.comprobar()
+        except AudioDemasiadoLargoError as e:
+            return JSONResponse({"error": str(e)}, status_code=413)
+        except SaturadoError as e:
+            return respuesta_saturado(e)
+
     return await call_next(request)
 
 # Página principal (requiere autenticación)
 @app.get("/asistente", response_class=HTMLResponse)
-async def asistente(request: Request, db: Session = Depends(get_db)):
+async def asistente(request: Request, db: AsyncSession = Depends(get_async_db_lectura)):
     """Página principal del asistente virtual"""
     usuario_id = request.state.usuario_id
-    usuario = AuthService.obtener_usuario_por_id(db, usuario_id)
+    usuario = await AuthService.obtener_usuario_por_id_async(db, usuario_id)
     
     return templates.TemplateResponse("./Asistente/M.0.1.html", {
         "request": request,
@@ -119,10 +160,10 @@ async def iniciar_sesion(
     request: Request,
     usuario: str = Form(...),
     contraseña: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        usuario_db = AuthService.autenticar_usuario(db, usuario, contraseña)
+        usuario_db = await AuthService.autenticar_usuario_async(db, usuario, contraseña)
         
         if not usuario_db:
             return templates.TemplateResponse("login/inicio_sesion.html", {
@@ -161,7 +202,7 @@ async def registrar_usuario(
     correo: str = Form(...),
     contraseña: str = Form(...),
     confirmar_contraseña: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         if contraseña != confirmar_contraseña:
@@ -176,7 +217,7 @@ async def registrar_usuario(
                 "error": "La contraseña debe tener al menos 6 caracteres"
             })
         
-        usuario_db = AuthService.registrar_usuario(db, nombre_completo, usuario, correo, contraseña)
+        usuario_db = await AuthService.registrar_usuario_async(db, nombre_completo, usuario, correo, contraseña)
         
         response = RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
         response.set_cookie(
@@ -220,10 +261,10 @@ async def mostrar_recuperacion(
 async def solicitar_recuperacion(
     request: Request,
     usuario_correo: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        resultado = AuthService.generar_codigo_recuperacion(db, usuario_correo)
+        resultado = await AuthService.generar_codigo_recuperacion_async(db, usuario_correo)
         
         return RedirectResponse(
             url=f"/recuperacion?usuario={usuario_correo}&step=2&info=Código enviado a {resultado['correo']}",
@@ -247,10 +288,10 @@ async def verificar_codigo_recuperacion(
     usuario_correo: str = Form(...),
     codigo: str = Form(...),
     marcar_como_utilizado: bool = Form(False),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        usuario_id = AuthService.validar_codigo_recuperacion(
+        usuario_id = await AuthService.validar_codigo_recuperacion_async(
             db, usuario_correo, codigo, marcar_como_utilizado=marcar_como_utilizado
         )
         
@@ -281,7 +322,7 @@ async def cambiar_contraseña_recuperacion(
     codigo: str = Form(...),
     nueva_contraseña: str = Form(...),
     confirmar_nueva_contraseña: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         if nueva_contraseña != confirmar_nueva_contraseña:
@@ -302,11 +343,11 @@ async def cambiar_contraseña_recuperacion(
                 "step": 3
             })
         
-        usuario_id = AuthService.validar_codigo_recuperacion(
+        usuario_id = await AuthService.validar_codigo_recuperacion_async(
             db, usuario_correo, codigo, marcar_como_utilizado=False
         )
         
-        AuthService.cambiar_contraseña(db, usuario_id, nueva_contraseña, codigo)
+        await AuthService.cambiar_contraseña_async(db, usuario_id, nueva_contraseña, codigo)
         
         return RedirectResponse(
             url="/login?success=Contraseña cambiada exitosamente. Ahora puedes iniciar sesión.",
@@ -336,92 +377,159 @@ async def cerrar_sesion():
     response.delete_cookie("usuario_id")
     return response
 
+# Sala de Socket.IO con todas las pestañas abiertas de un usuario
+def sala_usuario(usuario_id: int) -> str:
+    return f"usuario_{usuario_id}"
+
+# Ejecutar el comando transcrito en el pool de comandos sin bloquear la respuesta
+# y enviar el resultado por Socket.IO al usuario cuando termine
+tareas_comandos = set()
+
+def lanzar_comando(text: str, usuario_id: int):
+    futuro = ejecutor_comandos.enviar(text, usuario_id)
+
+    async def esperar_comando():
+        try:
+            resultado = await ejecutor_comandos.esperar(futuro)
+        except Exception as e:
+            print(f"Error ejecutando comando: {e}")
+            await sio.emit("comando_error", {"texto": text, "error": str(e)}, room=sala_usuario(usuario_id))
+            return
+
+        await sio.emit("resultado_comando", {"texto": text, **resultado}, room=sala_usuario(usuario_id))
+
+    tarea = asyncio.create_task(esperar_comando())
+    tareas_comandos.add(tarea)
+    tarea.add_done_callback(tareas_comandos.discard)
+
 # Ruta para procesar audio - SIN PyAudio, solo grabación web
 @app.post("/audio")
-async def audio(audio: UploadFile, request: Request, db: Session = Depends(get_db)):
+async def audio(audio: UploadFile, request: Request):
     try:
         if not audio:
             return JSONResponse({"error": "No se envió ningún archivo de audio."}, status_code=400)
 
         usuario_id = request.state.usuario_id
-        
-        webm_path = os.path.join("static", "temp", "audio.webm")
-        wav_path = os.path.join("static", "temp", "audio.wav")
 
-        # Crear directorio temporal si no existe
-        os.makedirs(os.path.dirname(webm_path), exist_ok=True)
-        
-        # Guardar archivo
-        with open(webm_path, "wb") as f:
-            f.write(await audio.read())
+        async with control_audio.admitir():
+            # Leer la subida en un buffer propio de esta petición
+            contenido = await AudioService.leer_subida(audio)
 
-        # Convertir de webm a wav
-        try:
-            audio_segment = AudioSegment.from_file(webm_path, format="webm")
-            audio_segment.export(wav_path, format="wav")
-        except Exception as e:
-            return JSONResponse({"error": f"Error al convertir el audio: {str(e)}"}, status_code=500)
-
-        # Transcribir usando SpeechRecognition (no requiere PyAudio)
-        recognizer = sr.Recognizer()
-        with sr.AudioFile(wav_path) as source:
-            audio_data = recognizer.record(source)
+            # Decodificar y transcribir fuera del event loop
+            text = await TranscripcionService.transcribir(contenido, formato="webm")
 
-        # Limpiar temporales
+        # Ejecutar comando; la transcripción ya está hecha, así que una cola de comandos llena no
+        # se convierte en 503 (el cliente perdería el texto y volvería a subir el audio)
         try:
-            os.remove(webm_path)
-            os.remove(wav_path)
-        except:
-            pass
-            
-        text = recognizer.recognize_google(audio_data, language="es-ES")
-        
-        # Ejecutar comando
-        def ejecutar_comando_con_db():
-            from db.models import get_db
-            from funciones.comandos import ejecutar_comando
-            db_local = next(get_db())
-            try:
-                ejecutar_comando(text, db_local, usuario_id)
-            except Exception as e:
-                print(f"Error ejecutando comando en thread: {e}")
-            finally:
-                db_local.close()
-        
-        threading.Thread(target=ejecutar_comando_con_db).start()
+            lanzar_comando(text, usuario_id)
+        except SaturadoError as e:
+            return JSONResponse({"text": text, "error_comando": str(e)}, status_code=200)
 
         return JSONResponse({"text": text}, status_code=200)
 
+    except SaturadoError as e:
+        return respuesta_saturado(e)
+    except AudioDemasiadoLargoError as e:
+        return JSONResponse({"error": str(e)}, status_code=413)
+    except ErrorConversionAudio as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
     except sr.UnknownValueError:
         return JSONResponse({"error": "No se pudo entender el audio."}, status_code=400)
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
 
+def validar_texto_comando(texto) -> str:
+    """Texto del comando limpio; lanza ValueError si está vacío o es demasiado largo"""
+    if not isinstance(texto, str) or not texto.strip():
+        raise ValueError("El comando está vacío.")
+    if len(texto) > COMANDO_MAX_CARACTERES:
+        raise ValueError(f"El comando supera los {COMANDO_MAX_CARACTERES} caracteres.")
+    return texto.strip()
+
+# Comandos escritos: misma ejecución e historial que /audio, sin pasar por el reconocimiento
+@app.post("/comando")
+async def comando(datos: dict, request: Request):
+    usuario_id = request.state.usuario_id
+    try:
+        texto = validar_texto_comando(datos.get("texto"))
+        resultado = {"texto": texto, **await ejecutor_comandos.ejecutar(texto, usuario_id)}
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except SaturadoError as e:
+        return respuesta_saturado(e)
+    except ComandoExpiradoError as e:
+        return JSONResponse({"error": str(e)}, status_code=504)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+    await sio.emit("resultado_comando", resultado, room=sala_usuario(usuario_id))
+    return resultado
+
+@app.post("/comandos")
+async def comandos_lote(datos: dict, request: Request):
+    usuario_id = request.state.usuario_id
+    lista = datos.get("comandos")
+    if not isinstance(lista, list) or not lista:
+        return JSONResponse({"error": "Envía una lista de comandos en 'comandos'."}, status_code=400)
+    if len(lista) > COMANDOS_MAX_LOTE:
+        return JSONResponse({"error": f"Máximo {COMANDOS_MAX_LOTE} comandos por lote."}, status_code=400)
+    try:
+        textos = [validar_texto_comando(texto) for texto in lista]
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    # Encolar todo el lote antes de esperar para que el pool lo ejecute en paralelo;
+    # si la cola se llena a mitad, esos comandos se devuelven con su error
+    esperas = []
+    for texto in textos:
+        try:
+            esperas.append(ejecutor_comandos.esperar(ejecutor_comandos.enviar(texto, usuario_id)))
+        except SaturadoError as e:
+            esperas.append(asyncio.sleep(0, result=e))
+    salidas = await asyncio.gather(*esperas, return_exceptions=True)
+
+    resultados = []
+    for texto, salida in zip(textos, salidas):
+        if isinstance(salida, Exception):
+            resultados.append({"texto": texto, "error": str(salida)})
+        else:
+            resultado = {"texto": texto, **salida}
+            resultados.append(resultado)
+            await sio.emit("resultado_comando", resultado, room=sala_usuario(usuario_id))
+
+    return {"resultados": resultados}
+
 # Rutas para el historial
 @app.get("/historial")
 async def obtener_historial(
     request: Request,
-    db: Session = Depends(get_db), 
-    buscar: str = None
+    db: AsyncSession = Depends(get_async_db_lectura), 
+    buscar: str = None,
+    cursor: str = None,
+    limite: int = HISTORIAL_PAGINA
 ):
     usuario_id = request.state.usuario_id
     
     if buscar:
-        registros = HistorialService.buscar_por_texto(db, buscar, usuario_id)
-    else:
-        registros = HistorialService.obtener_todos(db, usuario_id)
+        # Índice de texto completo: ordenado por relevancia, con fragmentos resaltados (una sola página)
+        registros = await HistorialService.buscar_texto_completo_async(db, buscar, usuario_id)
+        return {"registros": registros, "siguiente_cursor": None}
     
-    return {"registros": [r.to_dict() for r in registros]}
+    try:
+        registros, siguiente_cursor = await HistorialService.obtener_pagina_async(db, usuario_id, cursor, limite)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return {"registros": [r.to_dict() for r in registros], "siguiente_cursor": siguiente_cursor}
 
 @app.put("/historial/{registro_id}")
 async def actualizar_registro(
     registro_id: int, 
     datos: dict, 
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     usuario_id = request.state.usuario_id
-    registro = HistorialService.actualizar_registro(
+    registro = await HistorialService.actualizar_registro_async(
         db, registro_id, 
         datos.get("comando_usuario"), 
         datos.get("respuesta_asistente"),
@@ -435,38 +543,168 @@ async def actualizar_registro(
 async def eliminar_registro(
     registro_id: int, 
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     usuario_id = request.state.usuario_id
-    if HistorialService.eliminar_registro(db, registro_id, usuario_id):
+    if await HistorialService.eliminar_registro_async(db, registro_id, usuario_id):
         return {"mensaje": "Registro eliminado"}
     return {"error": "Registro no encontrado"}
 
+def generar_pdf_en_hilo(ruta_archivo: str, usuario_id: int) -> str:
+    """Generar el PDF con una sesión síncrona propia (reportlab es CPU y disco)"""
+    db_local = next(get_db_lectura())
+    try:
+        return HistorialService.generar_reporte_pdf(db_local, ruta_archivo, usuario_id)
+    finally:
+        db_local.close()
+
 @app.post("/historial/reportes/pdf")
-async def generar_reporte_pdf(request: Request, db: Session = Depends(get_db)):
+async def generar_reporte_pdf(request: Request, db: AsyncSession = Depends(get_async_db_lectura)):
     usuario_id = request.state.usuario_id
-    usuario = AuthService.obtener_usuario_por_id(db, usuario_id)
+    usuario = await AuthService.obtener_usuario_por_id_async(db, usuario_id)
     
     ruta_archivo = os.path.join("static", "reportes", f"historial_{usuario.usuario}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
     os.makedirs(os.path.dirname(ruta_archivo), exist_ok=True)
     
-    archivo_generado = HistorialService.generar_reporte_pdf(db, ruta_archivo, usuario_id)
+    archivo_generado = await asyncio.get_running_loop().run_in_executor(
+        None, generar_pdf_en_hilo, ruta_archivo, usuario_id
+    )
     
     return {"mensaje": "Reporte PDF generado", "archivo": archivo_generado}
 
+# Audio sintetizado de las respuestas (nombre = hash del texto, nunca cambia)
+@app.get("/voz/{nombre}")
+async def audio_respuesta(nombre: str):
+    ruta = VozService.ruta_archivo(nombre)
+    if not ruta:
+        raise HTTPException(status_code=404, detail="Audio no encontrado")
+    return FileResponse(
+        ruta,
+        media_type="audio/wav",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+@app.on_event("startup")
+async def crear_tablas():
+    # El esquema se crea al arrancar, no al importar db.models
+    inicializar_bd()
+
+@app.on_event("startup")
+async def cargar_motor_asr():
+    # Cargar el motor de reconocimiento una sola vez al arrancar
+    obtener_motor()
+
+@app.get("/metricas")
+async def metricas():
+    return {
+        "asr": {"motor": ASR_MOTOR, "latencias": latencias_asr.resumen()},
+        "cache_transcripciones": cache_transcripciones.estadisticas(),
+        "admision_audio": control_audio.estadisticas(),
+        "comandos": ejecutor_comandos.estadisticas(),
+        "cache_wikipedia": cache_wikipedia.estadisticas(),
+        "especulacion": dict(especulacion),
+        "parciales": dict(parciales)
+    }
+
+@app.on_event("shutdown")
+async def cerrar_pools():
+    # Drenar los comandos en curso antes de cerrar los pools de audio
+    await asyncio.get_running_loop().run_in_executor(None, ejecutor_comandos.cerrar)
+    cerrar_ejecutores()
+    from servicios.conocimiento_service import cerrar_cliente_conocimiento
+    await asyncio.get_running_loop().run_in_executor(None, cerrar_cliente_conocimiento)
+    await async_engine.dispose()
+    await async_engine_lectura.dispose()
+
 # SocketIO app mount
 app_mount = socketio.ASGIApp(sio, app)
 
-# Eventos de SocketIO (solo para grabación web)
+# Eventos de SocketIO (grabación web y reconocimiento por streaming)
+sesiones_streaming: Dict[str, SesionStreaming] = {}
+
+@sio.event
+async def connect(sid, environ):
+    # Asociar la conexión al usuario autenticado mediante la cookie de sesión; igual que el
+    # middleware HTTP, se rechazan las conexiones sin cookie o de usuarios que no existen
+    cookies = SimpleCookie(environ.get("HTTP_COOKIE", ""))
+    usuario_id = cookies["usuario_id"].value if "usuario_id" in cookies else None
+    if not usuario_id or not usuario_id.isdigit():
+        return False
+    usuario_id = int(usuario_id)
+    try:
+        async with AsyncSessionLectura() as db:
+            usuario = await AuthService.obtener_usuario_por_id_async(db, usuario_id)
+    except Exception:
+        return False
+    if not usuario:
+        return False
+    await sio.save_session(sid, {"usuario_id": usuario_id})
+
+    # Los resultados de los comandos se envían a la sala del usuario
+    await sio.enter_room(sid, sala_usuario(usuario_id))
+
+@sio.event
+async def disconnect(sid):
+    sesion = sesiones_streaming.pop(sid, None)
+    if sesion:
+        sesion.cancelar()
+
 @sio.on("iniciar_grabacion_web")
 async def iniciar_grabacion_web(sid, data=None):
     print("Grabación web iniciada desde cliente")
-    await sio.emit("grabacion_iniciada", {"message": "Listo para grabar"})
+    if data and data.get("streaming"):
+        sesion_sio = await sio.get_session(sid)
+        usuario_id = sesion_sio.get("usuario_id")
+        if usuario_id is None:
+            # El reconocimiento (ASR y decodificación) solo está disponible para usuarios autenticados
+            await sio.emit("transcripcion_error", {"error": "Inicia sesión para usar el reconocimiento de voz."}, to=sid)
+            return
+        sesiones_streaming[sid] = SesionStreaming(usuario_id, control_audio)
+    await sio.emit("grabacion_iniciada", {"message": "Listo para grabar"}, to=sid)
+
+@sio.on("audio_fragmento")
+async def audio_fragmento(sid, data):
+    sesion = sesiones_streaming.get(sid)
+    if sesion is None or not data:
+        return
+
+    try:
+        sesion.agregar(data)
+    except AudioDemasiadoLargoError as e:
+        sesiones_streaming.pop(sid, None)
+        sesion.cancelar()
+        await sio.emit("transcripcion_error", {"error": str(e)}, to=sid)
+        return
+
+    async def emitir_parcial(texto: str):
+        await sio.emit("transcripcion_parcial", {"text": texto}, to=sid)
+
+    sesion.programar_parcial(emitir_parcial)
 
 @sio.on("detener_grabacion")
 async def detener_grabacion_web(sid, data=None):
     print("Grabación web detenida")
-    await sio.emit("grabacion_detenida", {"message": "Grabación detenida"})
+    await sio.emit("grabacion_detenida", {"message": "Grabación detenida"}, to=sid)
+
+    sesion = sesiones_streaming.pop(sid, None)
+    if sesion is None:
+        return
+
+    try:
+        text = await sesion.finalizar()
+    except sr.UnknownValueError:
+        await sio.emit("transcripcion_error", {"error": "No se pudo entender el audio."}, to=sid)
+        return
+    except Exception as e:
+        await sio.emit("transcripcion_error", {"error": str(e)}, to=sid)
+        return
+
+    await sio.emit("transcripcion_final", {"text": text}, to=sid)
+
+    try:
+        lanzar_comando(text, sesion.usuario_id)
+    except SaturadoError as e:
+        await sio.emit("transcripcion_error", {"error": str(e)}, to=sid)
 
 # Información del sistema
 @app.get("/info")
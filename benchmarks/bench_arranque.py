@@ -0,0 +1,66 @@
+# benchmarks/bench_arranque.py
+# Uso: python -m benchmarks.bench_arranque [--repeticiones 5] [--max-ms 1500]
+# Mide el tiempo de importación de app.py con -X importtime y falla (código 1) si
+# vuelve a cargarse al arrancar alguna dependencia pesada o se supera el presupuesto.
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+
+# Módulos que solo deben cargarse en el primer uso
+MODULOS_PESADOS = ["numpy", "pydub", "reportlab", "pyttsx3", "pywhatkit", "wikipedia", "psutil"]
+
+_LINEA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def medir_importacion(modulo: str = "app"):
+    """Importar el módulo en un intérprete nuevo y devolver {módulo: (propio_us, acumulado_us, nivel)}"""
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{proceso.stderr[-2000:]}")
+
+    tiempos = {}
+    for linea in proceso.stderr.splitlines():
+        coincidencia = _LINEA.match(linea)
+        if coincidencia:
+            propio, acumulado, sangria, nombre = coincidencia.groups()
+            tiempos[nombre] = (int(propio), int(acumulado), (len(sangria) - 1) // 2)
+    return tiempos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modulo", default="app")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=0, help="Presupuesto de arranque (0 = sin límite)")
+    args = parser.parse_args()
+
+    totales = []
+    for _ in range(args.repeticiones):
+        tiempos = medir_importacion(args.modulo)
+        totales.append(tiempos[args.modulo][1] / 1000)
+    mediana = statistics.median(totales)
+    print(f"import {args.modulo}: mediana {mediana:8.1f} ms   mínimo {min(totales):8.1f} ms")
+
+    # Dependencias directas más caras de la última medición
+    print("\nDependencias de primer nivel más lentas:")
+    primer_nivel = [(acumulado, nombre) for nombre, (_, acumulado, nivel) in tiempos.items() if nivel == 1]
+    for acumulado, nombre in sorted(primer_nivel, reverse=True)[:10]:
+        print(f"  {acumulado / 1000:8.1f} ms  {nombre}")
+
+    errores = []
+    cargados = [m for m in MODULOS_PESADOS if m in tiempos]
+    if cargados:
+        errores.append(f"Dependencias pesadas cargadas al importar: {', '.join(cargados)}")
+    if args.max_ms and mediana > args.max_ms:
+        errores.append(f"Arranque de {mediana:.1f} ms por encima del presupuesto de {args.max_ms:g} ms")
+
+    for error in errores:
+        print(f"⚠️  {error}")
+    if errores:
+        sys.exit(1)
+    print("✅ Arranque dentro de lo esperado")
@@ -0,0 +1,117 @@
+# benchmarks/bench_bd_async.py
+# Uso: python -m benchmarks.bench_bd_async [--registros 1000] [--peticiones 400] [--concurrencia 8 32]
+# Compara un handler con sesión síncrona (bloquea el event loop) con uno que usa la sesión
+# asíncrona, bajo peticiones concurrentes. Usa una base de datos temporal.
+#
+# Con la sesión síncrona y más peticiones simultáneas que conexiones en el pool
+# (SQLITE_POOL_ESCRITURA + SQLITE_POOL_EXTRA), la consulta espera una conexión con el loop
+# bloqueado y las peticiones que podrían devolverla no avanzan: el servidor se queda parado
+# hasta el timeout del pool (SQLITE_POOL_TIMEOUT).
+import os
+import time
+import threading
+import asyncio
+import argparse
+import tempfile
+
+_temporal = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = os.path.join(_temporal.name, "bench.db")
+
+import httpx
+from fastapi import FastAPI, Depends
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.models import get_db, get_async_db, inicializar_bd, SessionLocal, HistorialInteraccion, Usuario
+from servicios.historial_service import HistorialService
+
+app = FastAPI()
+
+
+@app.get("/sincrono")
+async def historial_sincrono(db: Session = Depends(get_db)):
+    return {"registros": [r.to_dict() for r in HistorialService.obtener_todos(db, 1)[:50]]}
+
+
+@app.get("/asincrono")
+async def historial_asincrono(db: AsyncSession = Depends(get_async_db)):
+    return {"registros": [r.to_dict() for r in (await HistorialService.obtener_todos_async(db, 1))[:50]]}
+
+
+def poblar(registros: int):
+    inicializar_bd()
+    db = SessionLocal()
+    # Usuarios reales: la base de datos aplica las claves foráneas
+    db.add_all(Usuario(
+        id=i, nombre_completo=f"Usuario {i}", usuario=f"usuario{i}",
+        correo=f"usuario{i}@bench.local", contraseña="-"
+    ) for i in range(1, 6))
+    db.flush()
+    db.add_all(HistorialInteraccion(
+        usuario_id=1 + i % 5,
+        comando_usuario=f"dime algo número {i}",
+        comando_ejecutado="busca_wikipedia",
+        respuesta_asistente="Según Wikipedia: " + "texto " * 20
+    ) for i in range(registros))
+    db.commit()
+    db.close()
+
+
+async def medir(ruta: str, peticiones: int, concurrencia: int):
+    """Peticiones por segundo y máximo retraso del event loop mientras se atienden"""
+    retrasos = []
+    activo = True
+
+    async def latido():
+        # Un latido cada 5 ms: su retraso mide cuánto tiempo estuvo bloqueado el loop
+        while activo:
+            inicio = time.perf_counter()
+            await asyncio.sleep(0.005)
+            retrasos.append(time.perf_counter() - inicio - 0.005)
+
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        semaforo = asyncio.Semaphore(concurrencia)
+
+        async def una():
+            async with semaforo:
+                respuesta = await cliente.get(ruta)
+                respuesta.raise_for_status()
+
+        await una()  # calentamiento
+        tarea_latido = asyncio.create_task(latido())
+        inicio = time.perf_counter()
+        await asyncio.gather(*(una() for _ in range(peticiones)))
+        duracion = time.perf_counter() - inicio
+        activo = False
+        await tarea_latido
+
+    retrasos.sort()
+    return peticiones / duracion, retrasos[int(len(retrasos) * 0.99) - 1] * 1000, retrasos[-1] * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--registros", type=int, default=1000)
+    parser.add_argument("--peticiones", type=int, default=400)
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--limite", type=float, default=20, help="Segundos antes de dar una prueba por bloqueada")
+    args = parser.parse_args()
+
+    poblar(args.registros)
+    print(f"{args.registros} registros, {args.peticiones} peticiones por prueba\n")
+    # La síncrona va al final: si se bloquea, su hilo queda esperando al pool
+    for nombre, ruta in (("Sesión asíncrona", "/asincrono"), ("Sesión síncrona", "/sincrono")):
+        for concurrencia in args.concurrencia:
+            resultado = []
+            hilo = threading.Thread(
+                target=lambda: resultado.append(asyncio.run(medir(ruta, args.peticiones, concurrencia))),
+                daemon=True
+            )
+            hilo.start()
+            hilo.join(args.limite)
+            etiqueta = f"{nombre} (x{concurrencia})"
+            if not resultado:
+                print(f"{etiqueta:24} bloqueada: sin respuesta en {args.limite:g} s")
+                continue
+            por_segundo, p99, maximo = resultado[0]
+            print(f"{etiqueta:24} {por_segundo:7.1f} pet/s   retraso del loop p99 {p99:7.2f} ms   máx {maximo:7.2f} ms")
@@ -0,0 +1,165 @@
+# benchmarks/bench_conocimiento.py
+# Uso: python -m benchmarks.bench_conocimiento [--consultas 200] [--retraso-ms 20]
+# Levanta en local un sustituto de la API de MediaWiki (aiohttp.web, sin red) y ejecuta contra él
+# el ClienteConocimiento real: resúmenes, desambiguación, no encontrado, coalescencia de consultas
+# idénticas, tiempo agotado con mensaje descriptivo y cancelación de la corrutina en el loop del
+# cliente. Mide la latencia de consultas distintas en paralelo. Sale con código 1 si algo falla.
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from aiohttp import web
+from servicios.conocimiento_service import ClienteConocimiento, ErrorConocimiento
+
+PAGINAS = {
+    "python": {"title": "Python", "extract": "Python es un lenguaje de programación. Fue creado por Guido van Rossum."},
+    "mercurio": {"title": "Mercurio", "pageprops": {"disambiguation": ""},
+                 "links": [{"title": "Mercurio (planeta)"}, {"title": "Mercurio (elemento)"},
+                           {"title": "Mercurio (mitología)"}, {"title": "Mercurio (revista)"}]},
+}
+
+
+class ApiFalsa:
+    """Responde a list=search y prop=extracts|pageprops|links como la API de MediaWiki"""
+
+    def __init__(self, retraso: float = 0.0):
+        self.retraso = retraso
+        self.peticiones = 0
+        self.url = ""
+        self._loop = asyncio.new_event_loop()
+        self._listo = threading.Event()
+        threading.Thread(target=self._ejecutar, name="api-falsa", daemon=True).start()
+        self._listo.wait()
+
+    def _ejecutar(self):
+        asyncio.set_event_loop(self._loop)
+        aplicacion = web.Application()
+        aplicacion.router.add_get("/w/api.php", self._api)
+        self._runner = web.AppRunner(aplicacion)
+        self._loop.run_until_complete(self._runner.setup())
+        sitio = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(sitio.start())
+        host, puerto = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{puerto}/w/api.php"
+        self._listo.set()
+        self._loop.run_forever()
+
+    async def _api(self, peticion: web.Request) -> web.Response:
+        self.peticiones += 1
+        await asyncio.sleep(self.retraso)
+        parametros = peticion.query
+        if parametros.get("list") == "search":
+            consulta = parametros["srsearch"]
+            clave = consulta.split()[0]
+            # "tema N" (consultas distintas del benchmark de latencia) también existe
+            if clave in PAGINAS or clave == "tema":
+                return web.json_response({"query": {"search": [{"title": consulta}]}})
+            return web.json_response({"query": {"search": []}})
+
+        titulo = parametros["titles"]
+        pagina = PAGINAS.get(titulo.split()[0].lower(), {"title": titulo, "extract": f"{titulo} es un tema."})
+        return web.json_response({"query": {"pages": [dict(pagina, title=titulo)]}})
+
+    def cerrar(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def comprobar(nombre: str, ok: bool, detalle: str = "") -> bool:
+    print(f"{'✅' if ok else '⚠️'} {nombre}{': ' + detalle if detalle else ''}")
+    return ok
+
+
+def comprobar_respuestas(cliente: ClienteConocimiento) -> list:
+    resumen = cliente.resumen("python")
+    desambiguacion = cliente.resumen("mercurio")
+    ausente = cliente.resumen("xyzzy")
+    return [
+        comprobar("Resumen", resumen["tipo"] == "resumen" and resumen["texto"].startswith("Python es"),
+                  resumen["texto"][:40]),
+        comprobar("Desambiguación", desambiguacion["tipo"] == "desambiguacion"
+                  and len(desambiguacion["opciones"]) == 3, ", ".join(desambiguacion["opciones"])),
+        comprobar("No encontrado", ausente["tipo"] == "no_encontrado"),
+    ]
+
+
+def comprobar_coalescencia(cliente: ClienteConocimiento, api: ApiFalsa) -> bool:
+    api.retraso, api.peticiones = 0.2, 0
+    futuros = [cliente.precargar("python", 3) for _ in range(8)]
+    resultados = [f.result(timeout=5) for f in futuros]
+    api.retraso = 0.0
+    # Una sola consulta real: búsqueda + extracto
+    ok = api.peticiones == 2 and all(r == resultados[0] for r in resultados)
+    return comprobar("Coalescencia", ok, f"8 consultas idénticas → {api.peticiones} peticiones HTTP")
+
+
+def comprobar_tiempo_agotado(api: ApiFalsa) -> list:
+    # Respuesta más lenta que el timeout de cada petición
+    cliente = ClienteConocimiento(url_api=api.url, timeout=0.2)
+    api.retraso = 0.5
+    try:
+        cliente.resumen("python")
+        lento = comprobar("Servidor lento", False, "no se agotó el tiempo")
+    except ErrorConocimiento as e:
+        lento = comprobar("Servidor lento", "Tiempo de espera agotado" in str(e), str(e))
+
+    # Loop del cliente ocupado: vence el límite total de resumen() con la petición aún en curso
+    cliente.cerrar()
+    cliente = ClienteConocimiento(url_api=api.url, timeout=0.4)
+    api.retraso = 0.3
+    cliente._loop.call_soon_threadsafe(time.sleep, 0.8)
+    try:
+        cliente.resumen("python", 4)
+        total = comprobar("Límite total", False, "no se agotó el tiempo")
+    except ErrorConocimiento as e:
+        total = comprobar("Límite total", bool(str(e)) and "1.2 s" in str(e), str(e))
+    # La petición terminaría hacia 1.4 s; cancelada, ya no queda nada en vuelo
+    time.sleep(0.05)
+    en_vuelo = cliente.estadisticas()["en_vuelo"]
+    cancelada = comprobar("Corrutina cancelada tras el tiempo agotado", en_vuelo == 0, f"{en_vuelo} en vuelo")
+    api.retraso = 0.0
+    cliente.cerrar()
+    return [lento, total, cancelada]
+
+
+def medir_latencia(cliente: ClienteConocimiento, consultas: int):
+    inicio = time.perf_counter()
+    tiempos = []
+
+    def una(i: int):
+        t = time.perf_counter()
+        futuro = cliente.precargar(f"tema {i}")
+        futuro.add_done_callback(lambda _: tiempos.append(time.perf_counter() - t))
+        return futuro
+
+    futuros = [una(i) for i in range(consultas)]
+    for futuro in futuros:
+        futuro.result(timeout=30)
+    total = time.perf_counter() - inicio
+    tiempos.sort()
+    print(f"\n{consultas} consultas distintas en paralelo ({cliente.conexiones} conexiones): "
+          f"{total * 1000:.0f} ms en total, p50 {tiempos[len(tiempos) // 2] * 1000:.1f} ms, "
+          f"p95 {tiempos[int(len(tiempos) * 0.95)] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--retraso-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    api = ApiFalsa()
+    cliente = ClienteConocimiento(url_api=api.url, timeout=2)
+    resultados = comprobar_respuestas(cliente)
+    resultados.append(comprobar_coalescencia(cliente, api))
+    resultados += comprobar_tiempo_agotado(api)
+
+    api.retraso = args.retraso_ms / 1000
+    medir_latencia(cliente, args.consultas)
+    cliente.cerrar()
+    api.cerrar()
+
+    if not all(resultados):
+        sys.exit(1)
+    print("\n✅ Cliente de conocimiento correcto contra la API local")
@@ -0,0 +1,92 @@
+# benchmarks/bench_decodificacion.py
+# Uso: python -m benchmarks.bench_decodificacion [directorio_con_clips] [--repeticiones 5]
+# Compara la decodificación en proceso (PyAV) con pydub (un proceso ffmpeg por clip).
+# Sin directorio se generan clips webm/Opus cortos como los que graba el navegador (requiere PyAV).
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from servicios.audio_service import AudioService
+
+EXTENSIONES = (".webm", ".ogg", ".opus", ".wav", ".mp3", ".m4a")
+
+
+def generar_clips(directorio: str, duraciones=(0.8, 1.5, 2.0, 3.0, 5.0)):
+    """Clips webm/Opus de 48 kHz con tramos de tono y ruido que imitan una frase corta"""
+    import av
+    import numpy as np
+
+    frecuencia = 48000
+    rutas = []
+    for i, duracion in enumerate(duraciones):
+        t = np.arange(int(duracion * frecuencia)) / frecuencia
+        senal = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 3 * t) > 0)
+        senal += 0.01 * np.random.default_rng(i).standard_normal(len(t))
+        pcm = (senal * 32767).astype(np.int16)
+
+        ruta = os.path.join(directorio, f"clip_{i}_{duracion:g}s.webm")
+        with av.open(ruta, mode="w", format="webm") as contenedor:
+            pista = contenedor.add_stream("libopus", rate=frecuencia)
+            pista.layout = "mono"
+            for inicio in range(0, len(pcm), 960):
+                trama = av.AudioFrame.from_ndarray(pcm[None, inicio:inicio + 960], format="s16", layout="mono")
+                trama.sample_rate = frecuencia
+                trama.pts = inicio
+                for paquete in pista.encode(trama):
+                    contenedor.mux(paquete)
+            for paquete in pista.encode(None):
+                contenedor.mux(paquete)
+        rutas.append(ruta)
+    return rutas
+
+
+def medir(funcion, clips, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        for contenido, formato in clips:
+            inicio = time.perf_counter()
+            funcion(contenido, formato)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95) - 1], len(tiempos) / (sum(tiempos) / 1000)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directorio", nargs="?")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    temporal = None
+    if args.directorio:
+        rutas = sorted(os.path.join(args.directorio, n) for n in os.listdir(args.directorio)
+                       if n.lower().endswith(EXTENSIONES))
+    else:
+        temporal = tempfile.TemporaryDirectory()
+        rutas = generar_clips(temporal.name)
+    if not rutas:
+        sys.exit("No hay clips de audio que medir")
+
+    clips = []
+    for ruta in rutas:
+        with open(ruta, "rb") as archivo:
+            clips.append((archivo.read(), os.path.splitext(ruta)[1].lstrip(".")))
+    print(f"{len(clips)} clips, {args.repeticiones} repeticiones\n")
+
+    decodificadores = {
+        "pyav (en proceso)": lambda contenido, formato: AudioService.decodificar_pyav(contenido),
+        "pydub (ffmpeg)": lambda contenido, formato: AudioService.decodificar_pydub(contenido, formato),
+    }
+    for nombre, funcion in decodificadores.items():
+        try:
+            funcion(*clips[0])  # calentamiento: imports y carga de códecs
+        except Exception as e:
+            print(f"{nombre:18} no disponible: {e}")
+            continue
+        mediana, p95, por_segundo = medir(funcion, clips, args.repeticiones)
+        print(f"{nombre:18} mediana {mediana:7.2f} ms   p95 {p95:7.2f} ms   {por_segundo:7.1f} clips/s")
+
+    if temporal is not None:
+        temporal.cleanup()
@@ -0,0 +1,149 @@
+# benchmarks/bench_historial_audio.py
+# Uso: python -m benchmarks.bench_historial_audio [--peticiones 300] [--concurrencia 8] [--subidas 4]
+#      [--latencia-asr-ms 300] [--max-factor 0]
+# Lanza peticiones concurrentes a GET /historial contra la aplicación real (httpx + ASGI, base de
+# datos temporal) primero en reposo y después mientras varios clientes suben clips webm a /audio
+# sin parar. Informa p50/p95 de /historial en los dos casos: si la decodificación o el
+# reconocimiento bloquearan el event loop, la latencia del historial crecería con la carga de audio.
+# El motor ASR es el falso con latencia simulada (ASR_LATENCIA_FALSA) y la caché de
+# transcripciones se desactiva para que cada subida se decodifique y transcriba de verdad.
+# Con --max-factor > 0 sale con código 1 si el p95 con audio supera ese múltiplo del p95 en reposo.
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--peticiones", type=int, default=300)
+parser.add_argument("--concurrencia", type=int, default=8)
+parser.add_argument("--subidas", type=int, default=4, help="Clientes subiendo audio a la vez")
+parser.add_argument("--registros", type=int, default=500)
+parser.add_argument("--latencia-asr-ms", type=float, default=300)
+parser.add_argument("--max-factor", type=float, default=0, help="Límite p95 con audio / p95 en reposo (0 = sin límite)")
+args = parser.parse_args()
+
+_temporal = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = os.path.join(_temporal.name, "historial_audio.db")
+os.environ["ASR_MOTOR"] = "falso"
+os.environ["ASR_LATENCIA_FALSA"] = str(args.latencia_asr_ms / 1000)
+os.environ["TRANSCRIPCIONES_CACHE_MAX"] = "0"
+# Sin rechazos por cola llena: se mide la latencia, no la admisión
+os.environ.setdefault("AUDIO_MAX_EN_COLA", str(args.subidas * 2))
+
+import httpx
+from app import app_mount, cerrar_pools
+from db.models import inicializar_bd, SessionLocal, Usuario, HistorialInteraccion
+from benchmarks.bench_decodificacion import generar_clips
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def poblar(registros: int):
+    inicializar_bd()
+    db = SessionLocal()
+    db.add(Usuario(id=1, nombre_completo="Usuario 1", usuario="usuario1",
+                   correo="usuario1@bench.local", contraseña="-"))
+    db.flush()
+    db.add_all(HistorialInteraccion(
+        usuario_id=1, comando_usuario=f"dime algo número {i}",
+        comando_ejecutado="busca_wikipedia", respuesta_asistente="Según Wikipedia: " + "texto " * 20
+    ) for i in range(registros))
+    db.commit()
+    db.close()
+
+
+def percentil(tiempos: list, p: float) -> float:
+    tiempos = sorted(tiempos)
+    return tiempos[min(len(tiempos) - 1, int(len(tiempos) * p))] * 1000
+
+
+async def medir_historial(cliente: httpx.AsyncClient, peticiones: int, concurrencia: int) -> tuple:
+    """Latencias de /historial y retrasos del event loop mientras se atienden"""
+    semaforo = asyncio.Semaphore(concurrencia)
+    tiempos = []
+    retrasos = []
+    activo = True
+
+    async def latido():
+        # Un latido cada 5 ms: su retraso mide cuánto tiempo estuvo bloqueado el loop
+        while activo:
+            inicio = time.perf_counter()
+            await asyncio.sleep(0.005)
+            retrasos.append(time.perf_counter() - inicio - 0.005)
+
+    async def una():
+        async with semaforo:
+            inicio = time.perf_counter()
+            respuesta = await cliente.get("/historial")
+            respuesta.raise_for_status()
+            tiempos.append(time.perf_counter() - inicio)
+
+    tarea_latido = asyncio.create_task(latido())
+    await asyncio.gather(*(una() for _ in range(peticiones)))
+    activo = False
+    await tarea_latido
+    return tiempos, retrasos
+
+
+async def subir_sin_parar(cliente: httpx.AsyncClient, clips: list, parar: asyncio.Event, estados: dict):
+    i = 0
+    while not parar.is_set():
+        nombre, contenido = clips[i % len(clips)]
+        respuesta = await cliente.post("/audio", files={"audio": (nombre, contenido, "audio/webm")})
+        estados[respuesta.status_code] = estados.get(respuesta.status_code, 0) + 1
+        i += 1
+
+
+async def main() -> bool:
+    with tempfile.TemporaryDirectory() as directorio:
+        clips = []
+        for ruta in generar_clips(directorio, duraciones=(1.5, 2.0, 3.0)):
+            with open(ruta, "rb") as archivo:
+                clips.append((os.path.basename(ruta), archivo.read()))
+
+    transporte = httpx.ASGITransport(app=app_mount)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench",
+                                 cookies={"usuario_id": "1"}, timeout=60) as cliente:
+        await medir_historial(cliente, args.concurrencia, args.concurrencia)  # calentamiento
+        reposo, retrasos_reposo = await medir_historial(cliente, args.peticiones, args.concurrencia)
+
+        parar = asyncio.Event()
+        estados = {}
+        subidas = [asyncio.create_task(subir_sin_parar(cliente, clips, parar, estados))
+                   for _ in range(args.subidas)]
+        await asyncio.sleep(0.5)  # que las subidas lleguen a decodificar y transcribir
+        inicio = time.perf_counter()
+        con_audio, retrasos_audio = await medir_historial(cliente, args.peticiones, args.concurrencia)
+        duracion = time.perf_counter() - inicio
+        parar.set()
+        await asyncio.gather(*subidas)
+
+    await cerrar_pools()
+
+    print(f"{args.peticiones} peticiones a /historial (x{args.concurrencia}), {args.registros} registros\n")
+    for nombre, tiempos, retrasos in (("En reposo", reposo, retrasos_reposo),
+                                      (f"Con {args.subidas} subidas a /audio", con_audio, retrasos_audio)):
+        print(f"{nombre:28} p50 {percentil(tiempos, 0.5):8.2f} ms   p95 {percentil(tiempos, 0.95):8.2f} ms   "
+              f"retraso del loop máx {max(retrasos) * 1000:7.2f} ms")
+    completadas = sum(estados.values())
+    print(f"\nSubidas a /audio: {completadas} ({completadas / duracion:.1f}/s, ASR simulado "
+          f"{args.latencia_asr_ms:g} ms), códigos: {dict(sorted(estados.items()))}")
+
+    factor = percentil(con_audio, 0.95) / percentil(reposo, 0.95)
+    if args.max_factor and factor > args.max_factor:
+        print(f"⚠️ El p95 de /historial se multiplica por {factor:.1f} con audio (límite {args.max_factor:g})")
+        return False
+    if estados.get(200, 0) == 0:
+        print("⚠️ Ninguna subida a /audio terminó bien")
+        return False
+    print(f"✅ p95 de /historial con audio: x{factor:.1f} respecto al reposo")
+    return True
+
+
+if __name__ == "__main__":
+    poblar(args.registros)
+    if not asyncio.run(main()):
+        sys.exit(1)
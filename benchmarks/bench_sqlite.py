@@ -0,0 +1,124 @@
+# benchmarks/bench_sqlite.py
+# Uso: python -m benchmarks.bench_sqlite [--escritores 4] [--lectores 8] [--segundos 5] [--registros 2000]
+# Lecturas y escrituras concurrentes sobre historial_interacciones, como los hilos de comandos
+# (insertan) y los handlers del historial (leen). Compara el motor por defecto (journal DELETE)
+# con el perfil de db.conexion (WAL + pragmas, motor de lectura separado).
+import os
+import time
+import argparse
+import tempfile
+import threading
+
+_temporal = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = os.path.join(_temporal.name, "app.db")
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from db.conexion import crear_motor
+from db.models import Base, Usuario, HistorialInteraccion
+from servicios.historial_service import HistorialService
+
+USUARIOS = 5
+
+
+def motores_por_defecto(ruta: str):
+    motor = create_engine(f"sqlite:///{ruta}", connect_args={"check_same_thread": False})
+    return motor, motor
+
+
+def motores_wal(ruta: str):
+    return crear_motor(ruta), crear_motor(ruta, solo_lectura=True)
+
+
+def poblar(motor, registros: int):
+    Base.metadata.create_all(bind=motor)
+    db = sessionmaker(bind=motor)()
+    db.add_all(Usuario(
+        id=i, nombre_completo=f"Usuario {i}", usuario=f"usuario{i}",
+        correo=f"usuario{i}@bench.local", contraseña="-"
+    ) for i in range(1, USUARIOS + 1))
+    db.flush()
+    db.add_all(HistorialInteraccion(
+        usuario_id=1 + i % USUARIOS,
+        comando_usuario=f"dime algo número {i}",
+        comando_ejecutado="busca_wikipedia",
+        respuesta_asistente="Según Wikipedia: " + "texto " * 20
+    ) for i in range(registros))
+    db.commit()
+    db.close()
+
+
+def escribir(sesion, i: int):
+    db = sesion()
+    try:
+        HistorialService.crear_registro(
+            db, f"dime algo número {i}", "busca_wikipedia",
+            "Según Wikipedia: " + "texto " * 20, 1 + i % USUARIOS
+        )
+    finally:
+        db.close()
+
+
+def leer(sesion, i: int):
+    db = sesion()
+    try:
+        # Página de 50 limitada en SQL: cada lectura cuesta lo mismo aunque los escritores
+        # sigan insertando, así los dos perfiles leen la misma cantidad de datos
+        HistorialService.obtener_pagina(db, 1 + i % USUARIOS, None, 50)
+    finally:
+        db.close()
+
+
+def medir(fabrica, escritores: int, lectores: int, segundos: float, registros: int):
+    """Operaciones por segundo, p95 en ms y errores ("database is locked") por tipo de operación"""
+    directorio = tempfile.mkdtemp(dir=_temporal.name)
+    motor, motor_lectura = fabrica(os.path.join(directorio, "bench.db"))
+    poblar(motor, registros)
+    sesiones = {"escritura": sessionmaker(bind=motor), "lectura": sessionmaker(bind=motor_lectura)}
+    resultados = {"escritura": ([], [0]), "lectura": ([], [0])}
+    fin = time.perf_counter() + segundos
+
+    def trabajador(tipo, operacion, numero):
+        tiempos, errores = resultados[tipo]
+        i = numero
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            try:
+                operacion(sesiones[tipo], i)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            except OperationalError:
+                errores[0] += 1
+            i += escritores + lectores
+
+    hilos = [threading.Thread(target=trabajador, args=("escritura", escribir, n)) for n in range(escritores)]
+    hilos += [threading.Thread(target=trabajador, args=("lectura", leer, n)) for n in range(lectores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    motor.dispose()
+    motor_lectura.dispose()
+
+    resumen = {}
+    for tipo, (tiempos, errores) in resultados.items():
+        tiempos.sort()
+        p95 = tiempos[int(len(tiempos) * 0.95) - 1] if tiempos else float("nan")
+        resumen[tipo] = (len(tiempos) / segundos, p95, errores[0])
+    return resumen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--escritores", type=int, default=4)
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--registros", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{args.escritores} escritores, {args.lectores} lectores, {args.segundos:g} s, "
+          f"{args.registros} registros iniciales\n")
+    for nombre, fabrica in (("Por defecto (DELETE)", motores_por_defecto), ("WAL + pragmas", motores_wal)):
+        resumen = medir(fabrica, args.escritores, args.lectores, args.segundos, args.registros)
+        for tipo, (por_segundo, p95, errores) in resumen.items():
+            print(f"{nombre:22} {tipo:10} {por_segundo:8.1f} op/s   p95 {p95:8.2f} ms   errores {errores}")
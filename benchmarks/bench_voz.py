@@ -0,0 +1,44 @@
+# benchmarks/bench_voz.py
+# Uso: python -m benchmarks.bench_voz  (requiere pyttsx3 y un motor de voz del sistema)
+import time
+from funciones.voz import TrabajadorVoz
+
+FRASES = [
+    "La hora actual es: 10:30 AM",
+    "Buscando en Google: inteligencia artificial",
+    "Aquí tienes los resultados en tu navegador.",
+    "Te muestro lo que puedo hacer en pantalla.",
+]
+
+
+def habla_anterior(texto: str):
+    """hablaBOT original: nuevo motor y runAndWait bloqueante en cada llamada"""
+    import pyttsx3
+
+    habla = pyttsx3.init()
+    voces = habla.getProperty("voices")
+    if voces:
+        habla.setProperty("voice", voces[0].id)
+    habla.say(texto)
+    habla.runAndWait()
+
+
+def medir(funcion, repeticiones: int = 3):
+    tiempos = []
+    for _ in range(repeticiones):
+        for frase in FRASES:
+            inicio = time.perf_counter()
+            funcion(frase)
+            tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2] * 1000, tiempos[-1] * 1000
+
+
+if __name__ == "__main__":
+    mediana, maximo = medir(habla_anterior)
+    print(f"pyttsx3.init() por llamada: mediana {mediana:8.2f} ms   máximo {maximo:8.2f} ms")
+
+    trabajador = TrabajadorVoz()
+    mediana, maximo = medir(trabajador.decir)
+    print(f"Trabajador persistente:     mediana {mediana:8.2f} ms   máximo {maximo:8.2f} ms")
+    print(f"Mensajes descartados por antigüedad o cola llena: {trabajador.descartados}")
@@ -0,0 +1,173 @@
+# benchmarks/verificar_indices.py
+# Uso: python -m benchmarks.verificar_indices [--registros 2000]
+# Ejecuta las consultas reales de los servicios sobre una base de datos temporal, captura el SQL
+# emitido y comprueba con EXPLAIN QUERY PLAN que usan los índices compuestos (y FTS5 en la
+# búsqueda) y que el historial no se ordena en memoria. Comprueba que el índice de texto completo
+# sigue sincronizado tras editar y borrar, y aplica las migraciones a una base de datos sin índices.
+# Sale con código 1 si alguna comprobación falla.
+import os
+import sys
+import asyncio
+import sqlite3
+import argparse
+import tempfile
+
+_temporal = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = os.path.join(_temporal.name, "indices.db")
+
+from sqlalchemy import event
+from db.models import (DATABASE_PATH, engine, async_engine, SessionLocal, AsyncSessionLocal, inicializar_bd,
+                       Usuario, HistorialInteraccion, RecuperacionContraseña)
+from db.migraciones import migrar, MIGRACIONES
+from servicios.historial_service import HistorialService
+from servicios.auth_service import AuthService
+
+INDICE_HISTORIAL = "ix_historial_usuario_activo_fecha"
+INDICE_RECUPERACIONES = "ix_recuperaciones_usuario_codigo"
+
+capturadas = []
+
+
+def capturar(motor):
+    @event.listens_for(motor, "before_cursor_execute")
+    def antes(conexion, cursor, sentencia, parametros, contexto, multiples):
+        if sentencia.lstrip().upper().startswith("SELECT"):
+            capturadas.append((sentencia, parametros))
+
+
+def plan(sentencia: str, parametros) -> list:
+    with sqlite3.connect(DATABASE_PATH) as conexion:
+        return [fila[3] for fila in conexion.execute("EXPLAIN QUERY PLAN " + sentencia, parametros)]
+
+
+def poblar(registros: int):
+    inicializar_bd()
+    db = SessionLocal()
+    db.add_all(Usuario(
+        id=i, nombre_completo=f"Usuario {i}", usuario=f"usuario{i}",
+        correo=f"usuario{i}@bench.local", contraseña="-"
+    ) for i in range(1, 6))
+    db.flush()
+    db.add_all(HistorialInteraccion(
+        usuario_id=1 + i % 5, comando_usuario=f"dime algo número {i}",
+        comando_ejecutado="busca_wikipedia", respuesta_asistente="texto " * 20, activo=i % 7 != 0
+    ) for i in range(registros))
+    db.add_all(RecuperacionContraseña(usuario_id=1 + i % 5, codigo=f"{i:06d}") for i in range(200))
+    db.commit()
+    db.close()
+
+
+def consulta_de(llamada) -> list:
+    """Ejecutar una llamada a un servicio y devolver los SELECT que emitió"""
+    capturadas.clear()
+    try:
+        llamada()
+    except ValueError:
+        pass  # códigos inválidos: las consultas ya se ejecutaron
+    return list(capturadas)
+
+
+def comprobar(nombre: str, consultas: list, indice: str, filtro: str, sin_ordenar: bool = False) -> bool:
+    seleccionadas = [c for c in consultas if filtro in c[0]]
+    if not seleccionadas:
+        print(f"⚠️ {nombre}: no se capturó ninguna consulta sobre {filtro}")
+        return False
+    correcto = True
+    for sentencia, parametros in seleccionadas:
+        detalle = plan(sentencia, parametros)
+        usa_indice = any(indice in paso for paso in detalle)
+        ordena = any("TEMP B-TREE" in paso for paso in detalle)
+        ok = usa_indice and not (sin_ordenar and ordena)
+        correcto &= ok
+        print(f"{'✅' if ok else '⚠️'} {nombre}: {' | '.join(detalle)}")
+    return correcto
+
+
+def comprobar_fts(db) -> bool:
+    """Tras editar, borrar (lógico y definitivo) y restaurar, el índice FTS5 refleja solo los activos"""
+    ids = [r.id for r in HistorialService.obtener_todos(db, 2)[:3]]
+    HistorialService.actualizar_registro(db, ids[0], "pon la canción favorita", None, 2)
+    HistorialService.actualizar_registro(db, ids[1], "pon la canción triste", None, 2)
+    HistorialService.eliminar_registro(db, ids[1], 2)
+    HistorialService.eliminar_registro(db, ids[2], 2)
+    HistorialService.restaurar_registro(db, ids[2], 2)
+    HistorialService.eliminar_permanentemente(db, ids[2], 2)
+    encontrados = [r["id"] for r in HistorialService.buscar_texto_completo(db, "cancion", 2)]
+    with sqlite3.connect(DATABASE_PATH) as conexion:
+        # Sin rank=1: con contenido externo parcial, esa variante compara con todas las filas
+        conexion.execute("INSERT INTO historial_fts(historial_fts) VALUES('integrity-check')")
+        indexados = conexion.execute("SELECT count(*) FROM historial_fts_docsize").fetchone()[0]
+        activos = conexion.execute("SELECT count(*) FROM historial_interacciones WHERE activo").fetchone()[0]
+    ok = encontrados == [ids[0]] and indexados == activos
+    print(f"{'✅' if ok else '⚠️'} Índice FTS5 sincronizado: {indexados} indexados, {activos} activos, "
+          f"búsqueda sin acentos {encontrados}")
+    return ok
+
+
+def comprobar_migracion() -> bool:
+    """Base de datos anterior a las migraciones (user_version 0): migrar debe crear índices y FTS5"""
+    with engine.begin() as conexion:
+        conexion.exec_driver_sql(f"DROP INDEX {INDICE_HISTORIAL}")
+        conexion.exec_driver_sql(f"DROP INDEX {INDICE_RECUPERACIONES}")
+        for disparador in ("historial_fts_insertar", "historial_fts_actualizar", "historial_fts_eliminar"):
+            conexion.exec_driver_sql(f"DROP TRIGGER {disparador}")
+        conexion.exec_driver_sql("DROP TABLE historial_fts")
+        conexion.exec_driver_sql("PRAGMA user_version=0")
+    version = migrar(engine)
+    with sqlite3.connect(DATABASE_PATH) as conexion:
+        indices = {fila[0] for fila in conexion.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        indexados = conexion.execute("SELECT count(*) FROM historial_fts_docsize").fetchone()[0]
+        activos = conexion.execute("SELECT count(*) FROM historial_interacciones WHERE activo").fetchone()[0]
+    ok = (version == MIGRACIONES[-1][0] and {INDICE_HISTORIAL, INDICE_RECUPERACIONES} <= indices
+          and indexados == activos)
+    print(f"{'✅' if ok else '⚠️'} Migración desde versión 0: versión {version}, índices recreados: "
+          f"{INDICE_HISTORIAL in indices and INDICE_RECUPERACIONES in indices}, "
+          f"historial indexado: {indexados}/{activos}")
+    return ok and migrar(engine) == version  # idempotente: la segunda vez no hace nada
+
+
+async def consultas_async() -> list:
+    capturadas.clear()
+    async with AsyncSessionLocal() as db:
+        await HistorialService.obtener_todos_async(db, 1)
+        await HistorialService.buscar_por_texto_async(db, "algo", 1)
+    await async_engine.dispose()
+    return list(capturadas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--registros", type=int, default=2000)
+    args = parser.parse_args()
+
+    poblar(args.registros)
+    capturar(engine)
+    capturar(async_engine.sync_engine)
+    db = SessionLocal()
+    resultados = [
+        comprobar("obtener_todos", consulta_de(lambda: HistorialService.obtener_todos(db, 1)),
+                  INDICE_HISTORIAL, "historial_interacciones", sin_ordenar=True),
+        comprobar("obtener_pagina (con cursor)",
+                  consulta_de(lambda: HistorialService.obtener_pagina(db, 1, HistorialService.obtener_pagina(db, 1)[1])),
+                  INDICE_HISTORIAL, "historial_interacciones", sin_ordenar=True),
+        comprobar("buscar_por_texto", consulta_de(lambda: HistorialService.buscar_por_texto(db, "algo", 1)),
+                  INDICE_HISTORIAL, "historial_interacciones", sin_ordenar=True),
+        comprobar("buscar_texto_completo",
+                  consulta_de(lambda: HistorialService.buscar_texto_completo(db, "algo número", 1)),
+                  "VIRTUAL TABLE INDEX", "historial_fts"),
+        comprobar("historial async", asyncio.run(consultas_async()),
+                  INDICE_HISTORIAL, "historial_interacciones", sin_ordenar=True),
+        comprobar("validar_codigo_recuperacion",
+                  consulta_de(lambda: AuthService.validar_codigo_recuperacion(db, "usuario1", "999999")),
+                  INDICE_RECUPERACIONES, "recuperaciones_contraseña"),
+        comprobar("cambiar_contraseña",
+                  consulta_de(lambda: AuthService.cambiar_contraseña(db, 1, "secreta", "999999")),
+                  INDICE_RECUPERACIONES, "recuperaciones_contraseña"),
+    ]
+    resultados.append(comprobar_fts(db))
+    db.close()
+    resultados.append(comprobar_migracion())
+
+    if not all(resultados):
+        sys.exit(1)
+    print("\n✅ Todas las consultas usan los índices")
@@ -27,7 +27,8 @@ apt-get install -y --no-install-recommends \
     libogg-dev \
     libvorbis-dev \
     libmp3lame-dev \
-    libopus-dev
+    libopus-dev \
+    espeak-ng
 
 # 2. LIMPIAR CACHE PARA AHORRAR ESPACIO
 echo "[2/6] Limpiando cache de apt..."
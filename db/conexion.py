@@ -0,0 +1,84 @@
+# db/conexion.py - FÁBRICA DE MOTORES SQLITE
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+
+# Perfil de SQLite (configurable por variables de entorno)
+# - WAL: los lectores no bloquean al escritor ni al revés
+# - busy_timeout: esperar al cerrojo de escritura en lugar de fallar con "database is locked"
+# - synchronous=NORMAL: seguro con WAL, sin fsync en cada commit
+SQLITE_WAL = os.getenv("SQLITE_WAL", "true").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_CACHE_KB = int(os.getenv("SQLITE_CACHE_KB", 16 * 1024))
+SQLITE_MMAP_MB = int(os.getenv("SQLITE_MMAP_MB", 64))
+
+# Pools: escritura para los hilos de comandos y handlers que modifican datos,
+# lectura para las consultas del historial y la autenticación
+SQLITE_POOL_ESCRITURA = int(os.getenv("SQLITE_POOL_ESCRITURA", 8))
+SQLITE_POOL_LECTURA = int(os.getenv("SQLITE_POOL_LECTURA", 16))
+SQLITE_POOL_EXTRA = int(os.getenv("SQLITE_POOL_EXTRA", 8))
+SQLITE_POOL_TIMEOUT = float(os.getenv("SQLITE_POOL_TIMEOUT", 10))
+
+_SINCRONIA_VALIDA = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def configurar_conexion(conexion, solo_lectura: bool = False):
+    """Aplicar los pragmas a una conexión DBAPI recién abierta"""
+    cursor = conexion.cursor()
+    try:
+        # El modo WAL queda guardado en el archivo; lo fija la primera conexión de escritura
+        if SQLITE_WAL and not solo_lectura:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        if SQLITE_SYNCHRONOUS in _SINCRONIA_VALIDA:
+            cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_MB * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if solo_lectura:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def _registrar_pragmas(motor: Engine, solo_lectura: bool):
+    @event.listens_for(motor, "connect")
+    def al_conectar(conexion, _registro):
+        configurar_conexion(conexion, solo_lectura)
+
+
+def _opciones_pool(solo_lectura: bool) -> dict:
+    return {
+        "pool_size": SQLITE_POOL_LECTURA if solo_lectura else SQLITE_POOL_ESCRITURA,
+        "max_overflow": SQLITE_POOL_EXTRA,
+        "pool_timeout": SQLITE_POOL_TIMEOUT,
+    }
+
+
+def crear_motor(ruta: str, solo_lectura: bool = False) -> Engine:
+    """Motor síncrono para los hilos de comandos y las tareas en segundo plano"""
+    motor = create_engine(
+        f"sqlite:///{ruta}",
+        # Las conexiones del pool pasan de un hilo a otro (threadpool de FastAPI, comandos)
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        **_opciones_pool(solo_lectura)
+    )
+    _registrar_pragmas(motor, solo_lectura)
+    return motor
+
+
+def crear_motor_async(ruta: str, solo_lectura: bool = False) -> AsyncEngine:
+    """Motor asíncrono (aiosqlite) con el mismo perfil que el síncrono"""
+    motor = create_async_engine(
+        f"sqlite+aiosqlite:///{ruta}",
+        # Reutilizar conexiones (y sus pragmas) en lugar de abrir una por sesión
+        poolclass=AsyncAdaptedQueuePool,
+        connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        **_opciones_pool(solo_lectura)
+    )
+    _registrar_pragmas(motor.sync_engine, solo_lectura)
+    return motor
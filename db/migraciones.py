@@ -0,0 +1,96 @@
+# db/migraciones.py - MIGRACIONES VERSIONADAS DEL ESQUEMA
+# create_all solo crea tablas que faltan; los cambios sobre tablas existentes van aquí.
+# La versión aplicada se guarda en PRAGMA user_version del propio archivo SQLite.
+from sqlalchemy.engine import Engine
+
+
+def fts5_disponible(cursor) -> bool:
+    """Cierto si el SQLite enlazado se compiló con FTS5"""
+    cursor.execute("PRAGMA compile_options")
+    return any(fila[0] == "ENABLE_FTS5" for fila in cursor.fetchall())
+
+
+def _requiere_fts5(cursor) -> bool:
+    if fts5_disponible(cursor):
+        return True
+    # Sin el índice, la búsqueda del historial usa LIKE (HistorialService.buscar_texto_completo)
+    print("⚠️ SQLite sin FTS5: no se crea el índice de texto completo; la búsqueda usará LIKE")
+    return False
+
+
+# (versión, descripción, sentencias[, condición]). Solo se añaden migraciones al final; nunca se
+# editan las ya publicadas. Lo que también está declarado en los modelos se crea con IF NOT EXISTS:
+# en una base de datos nueva, create_all ya lo habrá creado. Si la condición (función que recibe
+# el cursor) es falsa, las sentencias se omiten y la versión se marca igualmente como aplicada.
+MIGRACIONES = [
+    (1, "índices compuestos del historial y de los códigos de recuperación", [
+        # Historial por usuario, solo activos, del más reciente al más antiguo: búsqueda
+        # por índice y recorrido inverso sin ordenar en memoria
+        "CREATE INDEX IF NOT EXISTS ix_historial_usuario_activo_fecha "
+        "ON historial_interacciones (usuario_id, activo, fecha_hora)",
+        # Validación de códigos: usuario + código + utilizado + expiración
+        "CREATE INDEX IF NOT EXISTS ix_recuperaciones_usuario_codigo "
+        "ON \"recuperaciones_contraseña\" (usuario_id, codigo, utilizado, expiracion)",
+    ]),
+    (2, "índice de texto completo (FTS5) del historial", [
+        # Tabla de contenido externo: el texto vive en historial_interacciones y el índice solo
+        # guarda los términos. unicode61 + remove_diacritics: "canción" encuentra "cancion"
+        "CREATE VIRTUAL TABLE IF NOT EXISTS historial_fts USING fts5("
+        "comando_usuario, respuesta_asistente, "
+        "content='historial_interacciones', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        # Solo se indexan los registros activos: el borrado lógico los saca del índice y
+        # restaurarlos los vuelve a añadir. Un 'delete' de FTS5 debe llevar los valores indexados.
+        # Por eso no se usa el comando 'rebuild', que indexaría también los registros borrados.
+        "CREATE TRIGGER IF NOT EXISTS historial_fts_insertar AFTER INSERT ON historial_interacciones "
+        "WHEN new.activo BEGIN "
+        "INSERT INTO historial_fts(rowid, comando_usuario, respuesta_asistente) "
+        "VALUES (new.id, new.comando_usuario, new.respuesta_asistente); END",
+        "CREATE TRIGGER IF NOT EXISTS historial_fts_actualizar "
+        "AFTER UPDATE OF comando_usuario, respuesta_asistente, activo ON historial_interacciones BEGIN "
+        "INSERT INTO historial_fts(historial_fts, rowid, comando_usuario, respuesta_asistente) "
+        "SELECT 'delete', old.id, old.comando_usuario, old.respuesta_asistente WHERE old.activo; "
+        "INSERT INTO historial_fts(rowid, comando_usuario, respuesta_asistente) "
+        "SELECT new.id, new.comando_usuario, new.respuesta_asistente WHERE new.activo; END",
+        "CREATE TRIGGER IF NOT EXISTS historial_fts_eliminar AFTER DELETE ON historial_interacciones "
+        "WHEN old.activo BEGIN "
+        "INSERT INTO historial_fts(historial_fts, rowid, comando_usuario, respuesta_asistente) "
+        "VALUES ('delete', old.id, old.comando_usuario, old.respuesta_asistente); END",
+        # Indexar el historial existente (se ejecuta una sola vez, con la migración)
+        "INSERT INTO historial_fts(rowid, comando_usuario, respuesta_asistente) "
+        "SELECT id, comando_usuario, respuesta_asistente FROM historial_interacciones WHERE activo",
+    ], _requiere_fts5),
+]
+
+
+def version_esquema(cursor) -> int:
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+
+def migrar(motor: Engine) -> int:
+    """Aplicar las migraciones pendientes en una transacción; devuelve la versión final"""
+    conexion = motor.raw_connection()
+    try:
+        cursor = conexion.cursor()
+        # IMMEDIATE: si arrancan varios procesos a la vez, el segundo espera y ve la versión nueva
+        cursor.execute("BEGIN IMMEDIATE")
+        version = version_esquema(cursor)
+        for numero, descripcion, sentencias, *condicion in MIGRACIONES:
+            if numero <= version:
+                continue
+            if all(cumple(cursor) for cumple in condicion):
+                for sentencia in sentencias:
+                    cursor.execute(sentencia)
+                print(f"✅ Migración {numero} aplicada: {descripcion}")
+            else:
+                print(f"⚠️ Migración {numero} omitida: {descripcion}")
+            cursor.execute(f"PRAGMA user_version={numero}")
+            version = numero
+        conexion.commit()
+        return version
+    except Exception:
+        conexion.rollback()
+        raise
+    finally:
+        conexion.close()
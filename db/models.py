@@ -1,17 +1,29 @@
 # db/models.py
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from db.conexion import crear_motor, crear_motor_async
 from datetime import datetime, timedelta
 import os
 import random
 
 # Configuración de la base de datos SQLite
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'asistente_virtual.db')}"
+DATABASE_PATH = os.getenv("DATABASE_PATH", os.path.join(BASE_DIR, 'asistente_virtual.db'))
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
-engine = create_engine(DATABASE_URL)
+# Motores síncronos: hilos de comandos, reportes y tareas en segundo plano
+engine = crear_motor(DATABASE_PATH)
+engine_lectura = crear_motor(DATABASE_PATH, solo_lectura=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLectura = sessionmaker(autocommit=False, autoflush=False, bind=engine_lectura)
+
+# Motores asíncronos: handlers de FastAPI y middleware (no bloquean el event loop)
+async_engine = crear_motor_async(DATABASE_PATH)
+async_engine_lectura = crear_motor_async(DATABASE_PATH, solo_lectura=True)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncSessionLectura = async_sessionmaker(async_engine_lectura, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 class Usuario(Base):
@@ -31,6 +43,9 @@ class Usuario(Base):
 
 class RecuperacionContraseña(Base):
     __tablename__ = "recuperaciones_contraseña"
+    __table_args__ = (
+        Index("ix_recuperaciones_usuario_codigo", "usuario_id", "codigo", "utilizado", "expiracion"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
@@ -43,6 +58,9 @@ class RecuperacionContraseña(Base):
 
 class HistorialInteraccion(Base):
     __tablename__ = "historial_interacciones"
+    __table_args__ = (
+        Index("ix_historial_usuario_activo_fecha", "usuario_id", "activo", "fecha_hora"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
@@ -66,12 +84,30 @@ class HistorialInteraccion(Base):
             "activo": self.activo
         }
 
-# Crear tablas
-Base.metadata.create_all(bind=engine)
+def inicializar_bd():
+    """Crear las tablas que falten y aplicar las migraciones; se llama una vez al arrancar"""
+    from db.migraciones import migrar
+    Base.metadata.create_all(bind=engine)
+    migrar(engine)
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_db_lectura():
+    db = SessionLectura()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_db_lectura():
+    async with AsyncSessionLectura() as db:
+        yield db
\ No newline at end of file
@@ -1,49 +1,42 @@
 # funciones/comandos.py - VERSIÓN COMPATIBLE CON RENDER
 import os
 import sys
+import importlib.util
 from datetime import datetime
 import urllib.parse
+import threading
 from typing import Optional
+from functools import lru_cache
 from sqlalchemy.orm import Session
 
 # ====== DETECCIÓN DE ENTORNO ======
 IS_RENDER = os.getenv('RENDER', 'false').lower() == 'true'
 
-# ====== IMPORT CONDICIONAL DE LIBRERÍAS QUE REQUIEREN GUI ======
-GUI_AVAILABLE = False
-pyttsx3 = None
-pywhatkit = None
-wikipedia = None
+# Sintetizar las respuestas a audio para reproducirlas en el navegador
+# (por defecto en Render, donde el servidor no tiene altavoces)
+VOZ_EN_NAVEGADOR = os.getenv('VOZ_EN_NAVEGADOR', str(IS_RENDER)).lower() == 'true'
 
-try:
-    # pyttsx3 puede funcionar en Render (sin sonido)
-    import pyttsx3
-    GUI_AVAILABLE = True
-except ImportError:
+# ====== LIBRERÍAS QUE REQUIEREN GUI (se cargan en el primer uso) ======
+# pyttsx3 lo importa el hilo de voz; aquí solo se comprueba que esté instalado
+PYTTSX3_DISPONIBLE = importlib.util.find_spec("pyttsx3") is not None
+if not PYTTSX3_DISPONIBLE:
     print("⚠️  pyttsx3 no disponible")
-except Exception as e:
-    print(f"⚠️  Error cargando pyttsx3: {e}")
 
-try:
-    # pywhatkit solo en local
-    if not IS_RENDER:
-        import pywhatkit
-        GUI_AVAILABLE = GUI_AVAILABLE or True
-    else:
-        print("⚠️  Modo Render: pywhatkit desactivado")
-except ImportError:
-    print("⚠️  pywhatkit no instalado")
-except Exception as e:
-    print(f"⚠️  Error cargando pywhatkit: {e}")
 
-try:
-    # wikipedia funciona en cualquier entorno
-    import wikipedia
-    wikipedia.set_lang("es")
-except ImportError:
-    print("⚠️  wikipedia no instalado")
-except Exception as e:
-    print(f"⚠️  Error cargando wikipedia: {e}")
+@lru_cache(maxsize=None)
+def cargar_pywhatkit():
+    """Importar pywhatkit la primera vez que se reproduce música (None si no se puede usar)"""
+    if IS_RENDER:
+        print("⚠️  Modo Render: pywhatkit desactivado")
+        return None
+    try:
+        import pywhatkit
+        return pywhatkit
+    except ImportError:
+        print("⚠️  pywhatkit no instalado")
+    except Exception as e:
+        print(f"⚠️  Error cargando pywhatkit: {e}")
+    return None
 
 # ====== IMPORT DE MÓDULOS PROPIOS ======
 try:
@@ -57,17 +50,27 @@ except ImportError:
 
 from db.models import get_db
 from servicios.historial_service import HistorialService
+from funciones.intenciones import clasificar
+from funciones.voz import trabajador_voz
+from servicios.voz_service import VozService
+from servicios.wikipedia_service import WikipediaService, WikipediaNoDisponibleError
+
+# Frases dichas por hablaBOT durante el comando en curso de cada hilo
+_frases_habladas = threading.local()
 
 def hablaBOT(texto: str):
     """El asistente responde con voz (si está disponible)."""
+    frases = getattr(_frases_habladas, "frases", None)
+    if frases is not None:
+        frases.append(texto)
+    
     try:
-        if pyttsx3 and not IS_RENDER:
-            habla = pyttsx3.init()
-            voces = habla.getProperty("voices")
-            if voces:
-                habla.setProperty("voice", voces[0].id)
-            habla.say(texto)
-            habla.runAndWait()
+        if VOZ_EN_NAVEGADOR:
+            # La voz la reproduce el navegador a partir del audio sintetizado
+            print(f"[Texto] {texto}")
+        elif PYTTSX3_DISPONIBLE and not IS_RENDER:
+            # El motor vive en un hilo propio; aquí solo se encola el mensaje
+            trabajador_voz().decir(texto)
             print(f"[Voz] {texto}")
         else:
             # En Render, solo imprimir el texto
@@ -78,19 +81,32 @@ def hablaBOT(texto: str):
 
 def ejecutar_comando(texto: str, db: Optional[Session] = None, usuario_id: Optional[int] = None) -> str:
     """Ejecuta el comando y registra en el historial"""
+    return procesar_comando(texto, db, usuario_id)["respuesta"]
+
+def procesar_comando(texto: str, db: Optional[Session] = None, usuario_id: Optional[int] = None,
+                     limite: Optional[float] = None) -> dict:
+    """Ejecuta el comando, registra en el historial y devuelve la respuesta junto al registro creado.
+    limite (time.monotonic) acota la síntesis de voz al tiempo que le queda al comando."""
     texto_original = texto
     texto = texto.lower()
     respuesta = ""
+    registro = None
+    _frases_habladas.frases = []
     
     print(f"[Comando] Usuario {usuario_id}: {texto}")
     
+    # Una sola clasificación para ejecutar el comando y etiquetar el historial
+    clasificacion = clasificar(texto)
+    intencion = clasificacion.intencion
+    
     try:
         # 1. Comando: REPRODUCE (YouTube)
-        if "reproduce" in texto:
-            musica = texto.replace("reproduce", "").strip()
+        if intencion == "reproduce":
+            musica = clasificacion.argumento
             respuesta = f"Reproduciendo {musica}"
             
-            if pywhatkit and not IS_RENDER and GUI_AVAILABLE:
+            pywhatkit = cargar_pywhatkit()
+            if pywhatkit:
                 hablaBOT(respuesta)
                 pywhatkit.playonyt(musica)
             else:
@@ -101,12 +117,8 @@ def ejecutar_comando(texto: str, db: Optional[Session] = None, usuario_id: Optio
                 abrir_en_navegador(url)
             
         # 2. Comando: BUSCA EN YOUTUBE
-        elif "busca en y" in texto or "busca en youtube" in texto:
-            if "busca en y" in texto:
-                musica = texto.replace("busca en y", "").strip()
-            else:
-                musica = texto.replace("busca en youtube", "").strip()
-                
+        elif intencion == "busca_youtube":
+            musica = clasificacion.argumento
             respuesta = f"Buscando en YouTube: {musica}"
             hablaBOT(respuesta)
             
@@ -120,14 +132,14 @@ def ejecutar_comando(texto: str, db: Optional[Session] = None, usuario_id: Optio
                 respuesta += ". Resultados abiertos en navegador."
             
         # 3. Comando: HORA
-        elif "hora" in texto:
+        elif intencion == "hora":
             hora = datetime.now().strftime("%H:%M %p")
             respuesta = f"La hora actual es: {hora}"
             hablaBOT(respuesta)
             
         # 4. Comando: BUSCA EN GOOGLE
-        elif "busca en" in texto and "youtube" not in texto:
-            consulta = texto.replace("busca en", "").replace("google", "").strip()
+        elif intencion == "busca_google":
+            consulta = clasificacion.argumento
             respuesta = f"Buscando en Google: {consulta}"
             hablaBOT(respuesta)
             
@@ -142,39 +154,36 @@ def ejecutar_comando(texto: str, db: Optional[Session] = None, usuario_id: Optio
                 respuesta += ". Resultados abiertos en navegador."
                 
         # 5. Comando: DIME (Wikipedia)
-        elif "dime" in texto:
-            consulta = texto.replace("dime", "").strip()
+        elif intencion == "dime":
+            consulta = clasificacion.argumento
             respuesta = f"Buscando información sobre: {consulta}"
             hablaBOT(respuesta)
             
-            if wikipedia:
-                try:
-                    resumen = wikipedia.summary(consulta, sentences=2)
-                    respuesta_final = f"Según Wikipedia: {resumen}"
-                    hablaBOT(respuesta_final)
-                    respuesta = respuesta_final
-                except wikipedia.exceptions.DisambiguationError as e:
-                    respuesta_final = f"Hay varios resultados para '{consulta}'. Opciones: {', '.join(e.options[:3])}"
-                    hablaBOT(respuesta_final)
-                    respuesta = respuesta_final
-                except wikipedia.exceptions.PageError:
+            try:
+                # Consulta con caché (resultados negativos incluidos)
+                resultado = WikipediaService.resumen(consulta, frases=2)
+                if resultado["tipo"] == "resumen":
+                    respuesta_final = f"Según Wikipedia: {resultado['texto']}"
+                elif resultado["tipo"] == "desambiguacion":
+                    respuesta_final = f"Hay varios resultados para '{consulta}'. Opciones: {', '.join(resultado['opciones'])}"
+                else:
                     respuesta_final = f"No encontré información sobre '{consulta}' en Wikipedia."
-                    hablaBOT(respuesta_final)
-                    respuesta = respuesta_final
-                except Exception as e:
-                    respuesta_final = f"Error en Wikipedia: {str(e)}"
-                    hablaBOT(respuesta_final)
-                    respuesta = respuesta_final
-            else:
+                hablaBOT(respuesta_final)
+                respuesta = respuesta_final
+            except WikipediaNoDisponibleError:
                 respuesta_final = f"Wikipedia no disponible. Busca '{consulta}' en Google."
                 hablaBOT(respuesta_final)
                 respuesta = respuesta_final
                 query = urllib.parse.quote(consulta)
                 url = f"https://www.google.com/search?q={query}"
                 abrir_en_navegador(url)
+            except Exception as e:
+                respuesta_final = f"Error en Wikipedia: {str(e)}"
+                hablaBOT(respuesta_final)
+                respuesta = respuesta_final
                 
         # 6. Comando: AYUDA
-        elif "ayuda" in texto or "qué puedes hacer" in texto:
+        elif intencion == "ayuda":
             respuesta = "📋 Puedo ayudarte con:\n"
             respuesta += "• Reproducir música en YouTube\n"
             respuesta += "• Buscar en YouTube\n"
@@ -195,9 +204,9 @@ def ejecutar_comando(texto: str, db: Optional[Session] = None, usuario_id: Optio
             
         # Registrar en el historial si tenemos db
         if db is not None and usuario_id is not None:
-            comando_ejecutado = determinar_comando_ejecutado(texto)
+            comando_ejecutado = clasificacion.etiqueta
             try:
-                HistorialService.crear_registro(
+                registro = HistorialService.crear_registro(
                     db=db, 
                     comando_usuario=texto_original, 
                     comando_ejecutado=comando_ejecutado, 
@@ -213,22 +222,18 @@ def ejecutar_comando(texto: str, db: Optional[Session] = None, usuario_id: Optio
         print(f"❌ Error en ejecutar_comando: {e}")
         hablaBOT("Lo siento, hubo un error al procesar tu comando.")
         
-    return respuesta
+    # Audio de las frases habladas, servido desde la caché de voz
+    frases, _frases_habladas.frases = _frases_habladas.frases, None
+    audios = []
+    if VOZ_EN_NAVEGADOR:
+        audios = [url for url in (VozService.obtener_url(f, limite) for f in frases) if url]
+    
+    return {
+        "respuesta": respuesta,
+        "registro": registro.to_dict() if registro is not None else None,
+        "audios": audios
+    }
 
 def determinar_comando_ejecutado(texto: str) -> str:
     """Determinar qué tipo de comando se ejecutó"""
-    texto = texto.lower()
-    if "reproduce" in texto:
-        return "reproduce_musica"
-    elif "busca en y" in texto or "busca en youtube" in texto:
-        return "busca_youtube"
-    elif "hora" in texto:
-        return "consulta_hora"
-    elif "busca en" in texto and "youtube" not in texto:
-        return "busca_google"
-    elif "dime" in texto:
-        return "busca_wikipedia"
-    elif "ayuda" in texto:
-        return "mostrar_ayuda"
-    else:
-        return "comando_no_reconocido"
+    return clasificar(texto).etiqueta
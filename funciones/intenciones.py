@@ -0,0 +1,219 @@
+# funciones/intenciones.py - CLASIFICACIÓN DE COMANDOS EN UNA SOLA PASADA
+import os
+import re
+import unicodedata
+from typing import List, NamedTuple, Optional
+
+
+class Intencion(NamedTuple):
+    nombre: str          # Identificador usado para despachar el comando
+    etiqueta: str        # Valor guardado en historial.comando_ejecutado
+    frases: List[str]    # Frases clave que activan la intención
+    requiere_argumento: bool = False  # Sin argumento no hay nada que buscar o reproducir
+
+
+class Clasificacion(NamedTuple):
+    intencion: Optional[str]
+    etiqueta: str
+    argumento: str
+
+
+# Registro de intenciones en orden de prioridad: si el texto contiene frases de
+# varias intenciones gana la primera de la lista
+INTENCIONES: List[Intencion] = [
+    Intencion("reproduce", "reproduce_musica", ["reproduce"], True),
+    Intencion("busca_youtube", "busca_youtube", ["busca en youtube", "busca en you tube", "busca en y"], True),
+    Intencion("hora", "consulta_hora", ["hora"]),
+    Intencion("busca_google", "busca_google", ["busca en google", "busca en"], True),
+    Intencion("dime", "busca_wikipedia", ["dime"], True),
+    Intencion("ayuda", "mostrar_ayuda", ["ayuda", "qué puedes hacer"]),
+]
+
+# Frases que deben terminar en fin de palabra: "busca en y recetas" sí, "busca en you tube" no
+# (sin el límite se quedaría "ou tube" como argumento)
+FRASES_PALABRA_COMPLETA = {"busca en y"}
+_FIN_PALABRA = r"\b"
+
+ETIQUETA_NO_RECONOCIDO = "comando_no_reconocido"
+
+# Coincidencia aproximada para transcripciones con errores ("reprodusce", "que puedes hacer")
+INTENCION_UMBRAL_DIFUSO = float(os.getenv("INTENCION_UMBRAL_DIFUSO", 0.7))
+# Parte mínima de los n-gramas de la frase que debe contener el texto: un prefijo ("busca"
+# frente a "busca en") se parece mucho pero no es la frase
+INTENCION_COBERTURA_MIN = float(os.getenv("INTENCION_COBERTURA_MIN", 0.75))
+
+
+def _patron_trie(frases: List[str]) -> str:
+    """Construir una expresión regular en forma de trie para que las frases con
+    prefijo común ("busca en", "busca en google"...) se comparen una sola vez"""
+    trie: dict = {}
+    for frase in frases:
+        nodo = trie
+        for caracter in frase:
+            nodo = nodo.setdefault(caracter, {})
+        if frase in FRASES_PALABRA_COMPLETA:
+            nodo = nodo.setdefault(_FIN_PALABRA, {})
+        nodo[""] = True
+
+    def construir(nodo: dict) -> str:
+        alternativas = [(c if c == _FIN_PALABRA else re.escape(c)) + construir(hijo)
+                        for c, hijo in sorted(nodo.items()) if c]
+        if not alternativas:
+            return ""
+        patron = alternativas[0] if len(alternativas) == 1 else "(?:" + "|".join(alternativas) + ")"
+        # Si aquí termina una frase, el resto es opcional (coincidencia más larga primero)
+        return f"(?:{patron})?" if "" in nodo else patron
+
+    return construir(trie)
+
+
+def _compilar(intenciones: List[Intencion]):
+    """Compilar todas las frases en una única expresión regular"""
+    prioridades = {}
+    for prioridad, intencion in enumerate(intenciones):
+        for frase in intencion.frases:
+            prioridades.setdefault(frase, prioridad)
+    return re.compile(_patron_trie(list(prioridades))), prioridades
+
+
+_PATRON, _PRIORIDADES = _compilar(INTENCIONES)
+
+
+def clasificar(texto: str) -> Clasificacion:
+    """Clasificar el texto recorriéndolo una sola vez y extraer el argumento del comando"""
+    texto = texto.lower()
+
+    mejor = None
+    for coincidencia in _PATRON.finditer(texto):
+        prioridad = _PRIORIDADES[coincidencia.group()]
+        if mejor is None or prioridad < mejor[0]:
+            mejor = (prioridad, coincidencia)
+            if prioridad == 0:
+                break
+
+    if mejor is None:
+        return clasificar_difuso(texto) or Clasificacion(None, ETIQUETA_NO_RECONOCIDO, texto.strip())
+
+    prioridad, coincidencia = mejor
+    intencion = INTENCIONES[prioridad]
+    argumento = (texto[:coincidencia.start()] + " " + texto[coincidencia.end():]).strip()
+    return Clasificacion(intencion.nombre, intencion.etiqueta, " ".join(argumento.split()))
+
+
+def _sin_acentos(texto: str) -> str:
+    texto = unicodedata.normalize("NFD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def _ngramas(texto: str) -> List[str]:
+    """Bigramas y trigramas de caracteres sin espacios ("you tube" = "youtube")"""
+    texto = "#" + "".join(texto.split()) + "#"
+    return [texto[i:i + n] for n in (2, 3) for i in range(len(texto) - n + 1)]
+
+
+class _IndiceDifuso:
+    """Matriz de n-gramas normalizada de todas las frases clave, construida una vez"""
+
+    def __init__(self, intenciones: List[Intencion]):
+        import numpy as np
+
+        self.frases = [(frase, prioridad) for prioridad, intencion in enumerate(intenciones)
+                       for frase in intencion.frases]
+        self.vocabulario = {}
+        for frase, _ in self.frases:
+            for ngrama in _ngramas(_sin_acentos(frase)):
+                self.vocabulario.setdefault(ngrama, len(self.vocabulario))
+
+        self.matriz = np.zeros((len(self.frases), len(self.vocabulario)), dtype=np.float32)
+        for fila, (frase, _) in enumerate(self.frases):
+            for ngrama in _ngramas(_sin_acentos(frase)):
+                self.matriz[fila, self.vocabulario[ngrama]] += 1
+        self.conteos = self.matriz.copy()
+        self.matriz /= np.linalg.norm(self.matriz, axis=1, keepdims=True)
+        # Ventanas de hasta una palabra más que la frase más larga (palabras partidas por el ASR)
+        self.max_palabras = max(len(frase.split()) for frase, _ in self.frases) + 1
+
+    def mejor(self, palabras: List[str]):
+        """Puntuar todas las ventanas de palabras contra todas las frases en una sola operación"""
+        import numpy as np
+
+        ventanas = [(i, j) for i in range(len(palabras))
+                    for j in range(i + 1, min(i + self.max_palabras, len(palabras)) + 1)]
+        if not ventanas:
+            return None
+
+        # Columna de cada n-grama; los que no aparecen en ninguna frase reciben columnas
+        # extra que no puntúan pero sí cuentan en la norma de la ventana
+        extra = {}
+
+        def columna(ngrama: str) -> int:
+            col = self.vocabulario.get(ngrama)
+            if col is None:
+                col = extra.setdefault(ngrama, len(self.vocabulario) + len(extra))
+            return col
+
+        texto = "".join(palabras)
+        limites = [0]
+        for palabra in palabras:
+            limites.append(limites[-1] + len(palabra))
+        inicio = np.array([limites[i] for i, _ in ventanas])
+        fin = np.array([limites[j] for _, j in ventanas])
+
+        # N-gramas interiores: un único recorrido del texto y sumas acumuladas por posición
+        interiores = {n: [columna(texto[p:p + n]) for p in range(len(texto) - n + 1)] for n in (2, 3)}
+        # N-gramas con el marcador de borde de cada ventana ("#re", "ce#"...)
+        filas, columnas = [], []
+        for k, (i, j) in enumerate(ventanas):
+            relleno = "#" + texto[limites[i]:limites[j]] + "#"
+            for n in (2, 3):
+                filas.append(k)
+                columnas.append(columna(relleno[:n]))
+                if len(relleno) > n:
+                    filas.append(k)
+                    columnas.append(columna(relleno[-n:]))
+
+        dimension = len(self.vocabulario) + len(extra)
+        vectores = np.zeros((len(ventanas), dimension), dtype=np.float32)
+        np.add.at(vectores, (filas, columnas), 1)
+        for n, cols in interiores.items():
+            acumulado = np.zeros((len(cols) + 1, dimension), dtype=np.float32)
+            if cols:
+                acumulado[np.arange(1, len(cols) + 1), cols] = 1
+                np.cumsum(acumulado, axis=0, out=acumulado)
+            # Posiciones de inicio válidas dentro de la ventana: [inicio, fin - n]
+            desde = np.minimum(inicio, len(cols))
+            hasta = np.maximum(fin - n + 1, desde)
+            vectores += acumulado[hasta] - acumulado[desde]
+
+        normas = np.linalg.norm(vectores, axis=1)
+        vocabulario = len(self.vocabulario)
+        similitud = (vectores[:, :vocabulario] @ self.matriz.T) / normas[:, None]
+
+        k, f = np.unravel_index(np.argmax(similitud), similitud.shape)
+        # Cobertura: fracción de los n-gramas de la frase presentes en la ventana
+        cobertura = np.minimum(vectores[k, :vocabulario], self.conteos[f]).sum() / self.conteos[f].sum()
+        return float(similitud[k, f]), ventanas[k], self.frases[f][1], float(cobertura)
+
+
+_indice_difuso: Optional[_IndiceDifuso] = None
+
+
+def clasificar_difuso(texto: str, umbral: float = INTENCION_UMBRAL_DIFUSO,
+                      cobertura_min: float = INTENCION_COBERTURA_MIN) -> Optional[Clasificacion]:
+    """Intención más parecida por similitud coseno de n-gramas (None si no supera el umbral,
+    la ventana no cubre la frase o falta el argumento que la intención necesita)"""
+    global _indice_difuso
+    if _indice_difuso is None:
+        _indice_difuso = _IndiceDifuso(INTENCIONES)
+
+    palabras = texto.lower().split()
+    resultado = _indice_difuso.mejor(_sin_acentos(" ".join(palabras)).split())
+    if resultado is None or resultado[0] < umbral or resultado[3] < cobertura_min:
+        return None
+
+    _, (i, j), prioridad, _ = resultado
+    intencion = INTENCIONES[prioridad]
+    argumento = " ".join(palabras[:i] + palabras[j:])
+    if intencion.requiere_argumento and not argumento:
+        return None
+    return Clasificacion(intencion.nombre, intencion.etiqueta, argumento)
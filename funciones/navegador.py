@@ -1,39 +1,84 @@
-import psutil
 import webbrowser
 import os
+import time
+import threading
+
+# Segundos que se reutiliza el navegador detectado antes de volver a recorrer los procesos
+NAVEGADOR_TTL = float(os.getenv("NAVEGADOR_TTL", 300))
+
+# Diccionario con navegadores comunes y sus posibles rutas de instalación
+NAVEGADORES = {
+    "opera.exe": [
+        r"C:\Users\%USERNAME%\AppData\Local\Programs\Opera GX\launcher.exe",
+        r"C:\Users\%USERNAME%\AppData\Local\Programs\Opera\launcher.exe"
+    ],
+    "chrome.exe": [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
+    ],
+    "firefox.exe": [
+        r"C:\Program Files\Mozilla Firefox\firefox.exe",
+        r"C:\Program Files (x86)\Mozilla Firefox\firefox.exe"
+    ],
+    "brave.exe": [
+        r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
+        r"C:\Program Files (x86)\BraveSoftware\Brave-Browser\Application\brave.exe"
+    ]
+}
+
+# (nombre registrado en webbrowser o None para el predeterminado, instante de detección)
+_detectado = None
+_registrados = set()
+_lock = threading.Lock()
+
+
+def _detectar_navegador():
+    """Recorrer los procesos una vez y registrar el primer navegador abierto con ruta conocida"""
+    try:
+        import psutil
+    except ImportError:
+        return None
 
-def abrir_en_navegador(url: str):
-    # Diccionario con navegadores comunes y sus posibles rutas de instalación
-    navegadores = {
-        "opera.exe": [
-            r"C:\Users\%USERNAME%\AppData\Local\Programs\Opera GX\launcher.exe",
-            r"C:\Users\%USERNAME%\AppData\Local\Programs\Opera\launcher.exe"
-        ],
-        "chrome.exe": [
-            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
-        ],
-        "firefox.exe": [
-            r"C:\Program Files\Mozilla Firefox\firefox.exe",
-            r"C:\Program Files (x86)\Mozilla Firefox\firefox.exe"
-        ],
-        "brave.exe": [
-            r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
-            r"C:\Program Files (x86)\BraveSoftware\Brave-Browser\Application\brave.exe"
-        ]
-    }
-
-    # Buscar procesos en ejecución
     for proc in psutil.process_iter(attrs=['name']):
-        nombre = proc.info['name'].lower()
-        if nombre in navegadores:
-            for ruta in navegadores[nombre]:
-                ruta_exp = os.path.expandvars(ruta)  # Expande %USERNAME%
-                if os.path.exists(ruta_exp):  # Verifica si existe
-                    nav = webbrowser.BackgroundBrowser(ruta_exp)
-                    webbrowser.register(nombre, None, nav)
-                    webbrowser.get(nombre).open_new_tab(url)
-                    return
+        nombre = (proc.info['name'] or "").lower()
+        if nombre not in NAVEGADORES:
+            continue
+        for ruta in NAVEGADORES[nombre]:
+            ruta_exp = os.path.expandvars(ruta)  # Expande %USERNAME%
+            if os.path.exists(ruta_exp):  # Verifica si existe
+                if nombre not in _registrados:
+                    webbrowser.register(nombre, None, webbrowser.BackgroundBrowser(ruta_exp))
+                    _registrados.add(nombre)
+                return nombre
+    return None
+
+
+def _navegador_actual():
+    """Navegador detectado, reutilizado mientras no caduque el TTL"""
+    global _detectado
+    with _lock:
+        if _detectado is None or time.monotonic() - _detectado[1] > NAVEGADOR_TTL:
+            _detectado = (_detectar_navegador(), time.monotonic())
+        return _detectado[0]
+
+
+def invalidar_navegador():
+    """Olvidar el navegador detectado para repetir la búsqueda en la próxima apertura"""
+    global _detectado
+    with _lock:
+        _detectado = None
+
+
+def abrir_en_navegador(url: str):
+    nombre = _navegador_actual()
+    if nombre:
+        try:
+            if webbrowser.get(nombre).open_new_tab(url):
+                return
+        except Exception as e:
+            print(f"⚠️  No se pudo abrir {nombre}: {e}")
+        # El navegador se cerró o cambió: volver a detectar la próxima vez
+        invalidar_navegador()
 
     # Si no encontró ninguno abierto, usar predeterminado
     webbrowser.open(url)
@@ -0,0 +1,124 @@
+# funciones/voz.py - MOTOR DE VOZ PERSISTENTE EN UN HILO DEDICADO
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+# Configuración de la cola de mensajes hablados
+VOZ_MAX_EN_COLA = int(os.getenv("VOZ_MAX_EN_COLA", 8))
+VOZ_MAX_ANTIGUEDAD = float(os.getenv("VOZ_MAX_ANTIGUEDAD", 10))
+# Identificador de la voz del sistema (vacío = la primera disponible)
+VOZ_ID = os.getenv("VOZ_ID", "")
+
+
+class TrabajadorVoz:
+    """Hilo dueño de un único motor pyttsx3; hablaBOT solo encola mensajes"""
+
+    def __init__(self, max_en_cola: int = VOZ_MAX_EN_COLA, max_antiguedad: float = VOZ_MAX_ANTIGUEDAD):
+        self.max_antiguedad = max_antiguedad
+        self._cola: "queue.Queue" = queue.Queue(maxsize=max_en_cola)
+        self._motor = None
+        self.descartados = 0
+        self._hilo = threading.Thread(target=self._bucle, name="voz", daemon=True)
+        self._hilo.start()
+
+    def decir(self, texto: str):
+        """Encolar un mensaje y volver de inmediato; si la cola está llena se descarta el más antiguo"""
+        self._encolar((time.monotonic(), texto, None, None))
+
+    def sintetizar(self, texto: str, destino: str) -> Future:
+        """Encolar la síntesis de un texto a un archivo de audio; el futuro devuelve la ruta"""
+        futuro: Future = Future()
+        self._encolar((time.monotonic(), texto, destino, futuro))
+        return futuro
+
+    def _encolar(self, mensaje):
+        while True:
+            try:
+                self._cola.put_nowait(mensaje)
+                return
+            except queue.Full:
+                try:
+                    self._descartar(self._cola.get_nowait())
+                except queue.Empty:
+                    pass
+
+    def _descartar(self, mensaje):
+        self.descartados += 1
+        futuro = mensaje[3]
+        if futuro is not None:
+            futuro.set_exception(RuntimeError("Síntesis descartada: cola de voz llena"))
+
+    def _iniciar_motor(self):
+        # El motor se crea y se usa siempre en este hilo (pyttsx3 no es seguro entre hilos)
+        import pyttsx3
+
+        motor = pyttsx3.init()
+        if VOZ_ID:
+            motor.setProperty("voice", VOZ_ID)
+        else:
+            voces = motor.getProperty("voices")
+            if voces:
+                motor.setProperty("voice", voces[0].id)
+        return motor
+
+    def _bucle(self):
+        while True:
+            mensajes = [self._cola.get()]
+            # Agrupar lo que se haya acumulado mientras se hablaba
+            while True:
+                try:
+                    mensajes.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Los mensajes hablados caducan; las síntesis a archivo tienen a alguien esperando
+            ahora = time.monotonic()
+            vigentes = []
+            for mensaje in mensajes:
+                if mensaje[3] is None and ahora - mensaje[0] > self.max_antiguedad:
+                    self._descartar(mensaje)
+                else:
+                    vigentes.append(mensaje)
+            if not vigentes:
+                continue
+
+            try:
+                if self._motor is None:
+                    self._motor = self._iniciar_motor()
+                for _, texto, destino, _ in vigentes:
+                    if destino is None:
+                        self._motor.say(texto)
+                    else:
+                        self._motor.save_to_file(texto, destino)
+                self._motor.runAndWait()
+            except Exception as e:
+                print(f"⚠️  Error en el motor de voz: {e}")
+                self._motor = None
+                for _, _, _, futuro in vigentes:
+                    if futuro is not None:
+                        futuro.set_exception(e)
+                continue
+
+            for _, _, destino, futuro in vigentes:
+                if futuro is None:
+                    continue
+                if os.path.exists(destino):
+                    futuro.set_result(destino)
+                else:
+                    futuro.set_exception(RuntimeError(f"El motor de voz no generó {destino}"))
+
+
+_trabajador: Optional[TrabajadorVoz] = None
+_lock = threading.Lock()
+
+
+def trabajador_voz() -> TrabajadorVoz:
+    """Devolver el trabajador de voz, creándolo la primera vez"""
+    global _trabajador
+    with _lock:
+        if _trabajador is None:
+            _trabajador = TrabajadorVoz()
+        return _trabajador
@@ -0,0 +1,98 @@
+# servicios/admision_service.py
+import math
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from servicios.metricas import RegistroLatencias
+
+
+class SaturadoError(Exception):
+    """El servicio no admite más trabajo en este momento"""
+
+    def __init__(self, mensaje: str, reintentar_en: int):
+        super().__init__(mensaje)
+        self.reintentar_en = reintentar_en
+
+
+class ControlAdmision:
+    """Limita el trabajo en curso y la cola de espera de un endpoint costoso"""
+
+    def __init__(self, max_en_curso: int, max_en_cola: int, espera_max: float):
+        self.max_en_curso = max_en_curso
+        self.max_en_cola = max_en_cola
+        self.espera_max = espera_max
+        self._semaforo = asyncio.Semaphore(max_en_curso)
+        self.en_curso = 0
+        self.en_cola = 0
+        self.admitidas = 0
+        self.rechazadas = 0
+        self.latencias = RegistroLatencias()
+
+    def saturado(self) -> bool:
+        """Cierto si una petición nueva sería rechazada sin llegar a esperar"""
+        return self._semaforo.locked() and self.en_cola >= self.max_en_cola
+
+    def reintentar_en(self) -> int:
+        """Segundos sugeridos al cliente para reintentar (cabecera Retry-After)"""
+        servicio = self.latencias.resumen().get("servicio")
+        media = servicio["media_ms"] / 1000 if servicio else self.espera_max
+        turnos = (self.en_cola + 1) / self.max_en_curso
+        return max(1, math.ceil(media * turnos))
+
+    def _rechazar(self, mensaje: str):
+        self.rechazadas += 1
+        raise SaturadoError(mensaje, self.reintentar_en())
+
+    def comprobar(self):
+        """Rechazar de inmediato si no hay hueco libre ni sitio en la cola"""
+        if self.saturado():
+            self._rechazar("Servidor ocupado, inténtalo de nuevo en unos segundos.")
+
+    def libre(self) -> bool:
+        """Cierto si hay un hueco de ejecución libre ahora mismo"""
+        return not self._semaforo.locked()
+
+    @asynccontextmanager
+    async def admitir(self, esperar: bool = True):
+        """Ocupar un hueco de ejecución esperando como mucho espera_max segundos.
+        Con esperar=False (trabajo opcional) solo se admite si hay un hueco libre, sin cola
+        y sin contar como rechazo."""
+        if not esperar and not self.libre():
+            raise SaturadoError("No hay huecos libres.", self.reintentar_en())
+        self.comprobar()
+
+        inicio = time.perf_counter()
+        if self._semaforo.locked():
+            self.en_cola += 1
+            try:
+                await asyncio.wait_for(self._semaforo.acquire(), timeout=self.espera_max)
+            except asyncio.TimeoutError:
+                self.latencias.registrar("espera", time.perf_counter() - inicio, exito=False)
+                self._rechazar("Tiempo de espera agotado, inténtalo de nuevo en unos segundos.")
+            finally:
+                self.en_cola -= 1
+        else:
+            # Hay hueco libre: se ocupa sin ceder el control al event loop
+            await self._semaforo.acquire()
+
+        self.latencias.registrar("espera", time.perf_counter() - inicio)
+        self.admitidas += 1
+        self.en_curso += 1
+        inicio_servicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latencias.registrar("servicio", time.perf_counter() - inicio_servicio)
+            self.en_curso -= 1
+            self._semaforo.release()
+
+    def estadisticas(self) -> dict:
+        return {
+            "en_curso": self.en_curso,
+            "en_cola": self.en_cola,
+            "max_en_curso": self.max_en_curso,
+            "max_en_cola": self.max_en_cola,
+            "admitidas": self.admitidas,
+            "rechazadas": self.rechazadas,
+            "latencias": self.latencias.resumen(),
+        }
@@ -0,0 +1,120 @@
+# servicios/asr_service.py
+import os
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+import speech_recognition as sr
+from servicios.metricas import RegistroLatencias
+
+# Motor de reconocimiento: google | vosk | falso
+ASR_MOTOR = os.getenv("ASR_MOTOR", "google").lower()
+ASR_IDIOMA = os.getenv("ASR_IDIOMA", "es-ES")
+VOSK_MODELO = os.getenv("VOSK_MODELO", os.path.join("modelos", "vosk-model-small-es-0.42"))
+ASR_TEXTO_FALSO = os.getenv("ASR_TEXTO_FALSO", "qué hora es")
+# Latencia simulada del motor falso (segundos), para pruebas de carga sin red
+ASR_LATENCIA_FALSA = float(os.getenv("ASR_LATENCIA_FALSA", 0))
+
+latencias_asr = RegistroLatencias()
+
+
+class MotorASR(ABC):
+    """Interfaz común de los motores de reconocimiento de voz"""
+
+    nombre = "base"
+
+    @abstractmethod
+    def reconocer(self, audio_data: sr.AudioData) -> str:
+        """Texto reconocido; lanza sr.UnknownValueError si no se entiende nada"""
+
+    def transcribir(self, audio_data: sr.AudioData) -> str:
+        """Reconocer el audio registrando la latencia del motor"""
+        inicio = time.perf_counter()
+        exito = False
+        try:
+            texto = self.reconocer(audio_data)
+            exito = True
+            return texto
+        finally:
+            latencias_asr.registrar(self.nombre, time.perf_counter() - inicio, exito)
+
+
+class MotorGoogle(MotorASR):
+    """Reconocimiento en línea con la API web de Google"""
+
+    nombre = "google"
+
+    def __init__(self, idioma: str = ASR_IDIOMA):
+        self.idioma = idioma
+
+    def reconocer(self, audio_data: sr.AudioData) -> str:
+        recognizer = sr.Recognizer()
+        return recognizer.recognize_google(audio_data, language=self.idioma)
+
+
+class MotorVosk(MotorASR):
+    """Reconocimiento local en CPU; el modelo se carga una sola vez y se comparte"""
+
+    nombre = "vosk"
+
+    def __init__(self, ruta_modelo: str = VOSK_MODELO):
+        import vosk
+
+        vosk.SetLogLevel(-1)
+        if not os.path.isdir(ruta_modelo):
+            raise ValueError(f"No se encontró el modelo de Vosk en '{ruta_modelo}'")
+        self._vosk = vosk
+        self.modelo = vosk.Model(ruta_modelo)
+
+    def reconocer(self, audio_data: sr.AudioData) -> str:
+        frecuencia = 16000
+        pcm = audio_data.get_raw_data(convert_rate=frecuencia, convert_width=2)
+
+        # Un reconocedor por petición; el modelo es compartido entre hilos
+        reconocedor = self._vosk.KaldiRecognizer(self.modelo, frecuencia)
+        reconocedor.AcceptWaveform(pcm)
+        texto = json.loads(reconocedor.FinalResult()).get("text", "").strip()
+
+        if not texto:
+            raise sr.UnknownValueError()
+        return texto
+
+
+class MotorFalso(MotorASR):
+    """Motor determinista para pruebas: siempre devuelve el mismo texto"""
+
+    nombre = "falso"
+
+    def __init__(self, texto: str = ASR_TEXTO_FALSO, latencia: float = ASR_LATENCIA_FALSA):
+        self.texto = texto
+        self.latencia = latencia
+
+    def reconocer(self, audio_data: sr.AudioData) -> str:
+        if self.latencia > 0:
+            time.sleep(self.latencia)
+        if not self.texto:
+            raise sr.UnknownValueError()
+        return self.texto
+
+
+MOTORES = {
+    MotorGoogle.nombre: MotorGoogle,
+    MotorVosk.nombre: MotorVosk,
+    MotorFalso.nombre: MotorFalso,
+}
+
+_motor: Optional[MotorASR] = None
+_lock = threading.Lock()
+
+
+def obtener_motor() -> MotorASR:
+    """Devolver el motor configurado, creándolo la primera vez"""
+    global _motor
+    with _lock:
+        if _motor is None:
+            if ASR_MOTOR not in MOTORES:
+                raise ValueError(f"Motor ASR desconocido: '{ASR_MOTOR}'. Opciones: {', '.join(MOTORES)}")
+            _motor = MOTORES[ASR_MOTOR]()
+            print(f"✅ Motor de reconocimiento: {_motor.nombre}")
+        return _motor
@@ -0,0 +1,217 @@
+# servicios/audio_service.py
+import io
+import os
+import shutil
+import importlib.util
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Tuple
+from fastapi import UploadFile
+import speech_recognition as sr
+
+# numpy, PyAV y pydub se importan al decodificar (normalmente en los procesos de decodificación)
+if TYPE_CHECKING:
+    import numpy as np
+
+# Límites configurables para las grabaciones recibidas
+AUDIO_MAX_BYTES = int(os.getenv("AUDIO_MAX_BYTES", 5 * 1024 * 1024))
+AUDIO_MAX_SEGUNDOS = float(os.getenv("AUDIO_MAX_SEGUNDOS", 30))
+# Cabeceras y separadores del formulario multipart que acompañan al archivo en /audio
+MARGEN_MULTIPART = 16 * 1024
+
+# Preprocesado previo al reconocimiento: mono, 16 kHz, 16 bits y recorte de silencios
+AUDIO_PREPROCESAR = os.getenv("AUDIO_PREPROCESAR", "true").lower() == "true"
+AUDIO_FRECUENCIA_OBJETIVO = 16000
+VAD_UMBRAL_DB = float(os.getenv("VAD_UMBRAL_DB", -45))
+VAD_SOBRE_RUIDO_DB = float(os.getenv("VAD_SOBRE_RUIDO_DB", 10))
+VAD_MARGEN_MS = int(os.getenv("VAD_MARGEN_MS", 200))
+VAD_VENTANA_MS = 30
+
+# Decodificador: "pyav" decodifica en el propio proceso con libavcodec; "pydub" lanza
+# un proceso ffmpeg por audio; "auto" usa PyAV si está instalado
+AUDIO_DECODIFICADOR = os.getenv("AUDIO_DECODIFICADOR", "auto").lower()
+
+
+class AudioDemasiadoLargoError(ValueError):
+    """El audio recibido supera los límites configurados"""
+
+
+class AudioSinVozError(ValueError):
+    """El audio no contiene ningún tramo con voz"""
+
+
+@lru_cache(maxsize=None)
+def decodificador_activo() -> str:
+    if AUDIO_DECODIFICADOR != "auto":
+        return AUDIO_DECODIFICADOR
+    return "pyav" if importlib.util.find_spec("av") is not None else "pydub"
+
+
+@lru_cache(maxsize=None)
+def pydub_disponible() -> bool:
+    """pydub instalado y un ejecutable de ffmpeg al que pueda llamar"""
+    return importlib.util.find_spec("pydub") is not None and shutil.which("ffmpeg") is not None
+
+
+class AudioService:
+
+    @staticmethod
+    def comprobar_longitud(content_length: Optional[str], max_bytes: int = AUDIO_MAX_BYTES):
+        """Rechazar una subida por su cabecera Content-Length, antes de leer el cuerpo"""
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes + MARGEN_MULTIPART:
+            raise AudioDemasiadoLargoError(
+                f"El audio supera el tamaño máximo permitido ({max_bytes // 1024} KB)"
+            )
+
+    @staticmethod
+    async def leer_subida(audio: UploadFile, max_bytes: int = AUDIO_MAX_BYTES) -> bytes:
+        """Leer el archivo subido comprobando su tamaño.
+
+        Starlette ya ha procesado todo el formulario al llegar aquí: el rechazo temprano se hace
+        en el middleware con comprobar_longitud; esto cubre las peticiones sin Content-Length.
+        """
+        if audio.size is not None and audio.size > max_bytes:
+            raise AudioDemasiadoLargoError(
+                f"El audio supera el tamaño máximo permitido ({max_bytes // 1024} KB)"
+            )
+        contenido = await audio.read()
+        if len(contenido) > max_bytes:
+            raise AudioDemasiadoLargoError(
+                f"El audio supera el tamaño máximo permitido ({max_bytes // 1024} KB)"
+            )
+        return contenido
+
+    @staticmethod
+    def decodificar(contenido: bytes, formato: str = "webm",
+                    max_segundos: float = AUDIO_MAX_SEGUNDOS) -> sr.AudioData:
+        """Decodificar el audio en memoria y devolverlo listo para el reconocedor"""
+        import numpy as np
+
+        if decodificador_activo() == "pyav":
+            try:
+                # Con preprocesado, libswresample entrega directamente mono a 16 kHz
+                muestras, canales, frecuencia = AudioService.decodificar_pyav(
+                    contenido, max_segundos, AUDIO_FRECUENCIA_OBJETIVO if AUDIO_PREPROCESAR else None
+                )
+            except Exception as error_pyav:
+                if not pydub_disponible():
+                    raise
+                # Un contenedor que libav no acepta puede abrirlo ffmpeg (p. ej. otra versión): un reintento
+                print(f"⚠️  PyAV no pudo decodificar el audio ({type(error_pyav).__name__}: {error_pyav}); "
+                      f"reintentando con pydub")
+                try:
+                    muestras, canales, frecuencia = AudioService.decodificar_pydub(contenido, formato, max_segundos)
+                except Exception:
+                    # Si tampoco sirve, el error de PyAV es el que describe el audio recibido
+                    raise error_pyav
+        else:
+            muestras, canales, frecuencia = AudioService.decodificar_pydub(contenido, formato, max_segundos)
+
+        if len(muestras) / (canales * frecuencia) > max_segundos:
+            raise AudioDemasiadoLargoError(
+                f"El audio supera la duración máxima permitida ({max_segundos:g} s)"
+            )
+
+        if not AUDIO_PREPROCESAR:
+            if canales > 1:
+                muestras = muestras.reshape(-1, canales).mean(axis=1).astype(np.int16)
+            return sr.AudioData(muestras.tobytes(), frecuencia, 2)
+
+        pcm = AudioService.preprocesar(muestras, canales, frecuencia)
+        return sr.AudioData(pcm.tobytes(), AUDIO_FRECUENCIA_OBJETIVO, 2)
+
+    @staticmethod
+    def decodificar_pyav(contenido: bytes, max_segundos: float = AUDIO_MAX_SEGUNDOS,
+                         frecuencia: Optional[int] = None) -> Tuple["np.ndarray", int, int]:
+        """Decodificar con PyAV sin lanzar procesos; devuelve PCM mono de 16 bits"""
+        import av
+        import av.logging
+        import numpy as np
+
+        # Las grabaciones parciales terminan a mitad de un bloque: libav lo anota en stderr
+        # en cada fragmento; los errores reales llegan igualmente como excepciones
+        av.logging.set_level(av.logging.FATAL)
+
+        partes = []
+        with av.open(io.BytesIO(contenido), mode="r") as contenedor:
+            pista = contenedor.streams.audio[0]
+            frecuencia = frecuencia or pista.codec_context.sample_rate
+            remuestreador = av.AudioResampler(format="s16", layout="mono", rate=frecuencia)
+
+            # Se deja de decodificar un poco después del límite, igual que con ffmpeg
+            limite = int((max_segundos + 0.5) * frecuencia)
+            total = 0
+            for trama in contenedor.decode(pista):
+                for salida in remuestreador.resample(trama):
+                    partes.append(salida.to_ndarray().reshape(-1))
+                    total += partes[-1].size
+                if total > limite:
+                    break
+            else:
+                for salida in remuestreador.resample(None):
+                    partes.append(salida.to_ndarray().reshape(-1))
+
+        muestras = np.concatenate(partes) if partes else np.zeros(0, dtype=np.int16)
+        return muestras, 1, frecuencia
+
+    @staticmethod
+    def decodificar_pydub(contenido: bytes, formato: str = "webm",
+                          max_segundos: float = AUDIO_MAX_SEGUNDOS) -> Tuple["np.ndarray", int, int]:
+        """Decodificar con pydub (un proceso ffmpeg por audio); devuelve PCM entrelazado de 16 bits"""
+        import numpy as np
+        from pydub import AudioSegment
+
+        # ffmpeg recibe los bytes por stdin y corta un poco después del límite,
+        # así un audio demasiado largo nunca se decodifica completo
+        segmento = AudioSegment.from_file(
+            io.BytesIO(contenido), format=formato, duration=max_segundos + 0.5
+        ).set_sample_width(2)
+        return np.frombuffer(segmento.raw_data, dtype=np.int16), segmento.channels, segmento.frame_rate
+
+    @staticmethod
+    def preprocesar(muestras: "np.ndarray", canales: int, frecuencia: int) -> "np.ndarray":
+        """Convertir PCM de 16 bits entrelazado a mono 16 kHz sin silencios al inicio y al final"""
+        import numpy as np
+
+        # Mezclar los canales a mono
+        senal = muestras.reshape(-1, canales).astype(np.float32).mean(axis=1)
+
+        # Remuestrear a 16 kHz con un filtro paso bajo de media móvil previo
+        if frecuencia != AUDIO_FRECUENCIA_OBJETIVO and len(senal) > 0:
+            razon = frecuencia / AUDIO_FRECUENCIA_OBJETIVO
+            if razon > 1:
+                ancho = int(np.ceil(razon))
+                senal = np.convolve(senal, np.ones(ancho, dtype=np.float32) / ancho, mode="same")
+            n_salida = int(round(len(senal) / razon))
+            posiciones = np.arange(n_salida, dtype=np.float64) * razon
+            senal = np.interp(posiciones, np.arange(len(senal)), senal).astype(np.float32)
+
+        senal = AudioService.recortar_silencios(senal, AUDIO_FRECUENCIA_OBJETIVO)
+        return np.clip(np.round(senal), -32768, 32767).astype(np.int16)
+
+    @staticmethod
+    def recortar_silencios(senal: "np.ndarray", frecuencia: int) -> "np.ndarray":
+        """Quitar el silencio inicial y final con un detector de voz por energía"""
+        import numpy as np
+
+        tam_ventana = frecuencia * VAD_VENTANA_MS // 1000
+        n_ventanas = len(senal) // tam_ventana
+        if n_ventanas == 0:
+            raise AudioSinVozError("El audio está vacío")
+
+        # Energía de cada ventana en dBFS
+        ventanas = senal[:n_ventanas * tam_ventana].reshape(n_ventanas, tam_ventana)
+        rms = np.sqrt(np.mean(ventanas ** 2, axis=1))
+        energia_db = 20 * np.log10(np.maximum(rms, 1e-9) / 32768.0)
+
+        # Umbral: por encima del piso de ruido, sin llegar a recortar el pico de voz
+        piso_ruido = np.percentile(energia_db, 10)
+        umbral = max(VAD_UMBRAL_DB, min(piso_ruido + VAD_SOBRE_RUIDO_DB, energia_db.max() - 20))
+
+        con_voz = np.flatnonzero(energia_db > umbral)
+        if len(con_voz) == 0:
+            raise AudioSinVozError("No se detectó voz en el audio")
+
+        margen = frecuencia * VAD_MARGEN_MS // 1000
+        inicio = max(0, con_voz[0] * tam_ventana - margen)
+        fin = min(len(senal), (con_voz[-1] + 1) * tam_ventana + margen)
+        return senal[inicio:fin]
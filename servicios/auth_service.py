@@ -3,7 +3,10 @@ import smtplib
 import ssl
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import asyncio
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from db.models import Usuario, RecuperacionContraseña
 from datetime import datetime, timedelta
 import random
@@ -92,6 +95,11 @@ class AuthService:
         db.add(recuperacion)
         db.commit()
         
+        return AuthService._notificar_codigo(usuario, codigo)
+    
+    @staticmethod
+    def _notificar_codigo(usuario: Usuario, codigo: str) -> dict:
+        """Enviar el código por correo (bloqueante: SMTP)"""
         # Enviar correo
         try:
             AuthService._enviar_correo_gmail(usuario.correo, usuario.usuario, codigo)
@@ -321,3 +329,150 @@ class AuthService:
     def obtener_usuario_por_id(db: Session, usuario_id: int):
         """Obtener usuario por ID"""
         return db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    
+    # ====== VERSIONES ASÍNCRONAS (handlers de FastAPI y middleware) ======
+    
+    @staticmethod
+    def _consulta_usuario_activo(usuario_o_correo: str):
+        return select(Usuario).where(
+            (Usuario.usuario == usuario_o_correo) | (Usuario.correo == usuario_o_correo),
+            Usuario.activo == True
+        )
+    
+    @staticmethod
+    async def registrar_usuario_async(db: AsyncSession, nombre_completo: str, usuario: str, correo: str, contraseña: str):
+        """Registrar un nuevo usuario"""
+        usuario_existente = await db.scalar(select(Usuario).where(
+            (Usuario.usuario == usuario) | (Usuario.correo == correo)
+        ))
+        
+        if usuario_existente:
+            if usuario_existente.usuario == usuario:
+                raise ValueError("El nombre de usuario ya está en uso")
+            else:
+                raise ValueError("El correo electrónico ya está registrado")
+        
+        nuevo_usuario = Usuario(
+            nombre_completo=nombre_completo,
+            usuario=usuario,
+            correo=correo,
+            contraseña=contraseña
+        )
+        
+        db.add(nuevo_usuario)
+        await db.commit()
+        await db.refresh(nuevo_usuario)
+        
+        return nuevo_usuario
+    
+    @staticmethod
+    async def autenticar_usuario_async(db: AsyncSession, usuario: str, contraseña: str) -> Optional[Usuario]:
+        """Autenticar un usuario"""
+        usuario_db = await db.scalar(select(Usuario).where(
+            Usuario.usuario == usuario,
+            Usuario.activo == True
+        ))
+        
+        if usuario_db and usuario_db.contraseña == contraseña:
+            return usuario_db
+        
+        return None
+    
+    @staticmethod
+    async def generar_codigo_recuperacion_async(db: AsyncSession, usuario_o_correo: str):
+        """Generar código de recuperación de contraseña"""
+        usuario = await db.scalar(AuthService._consulta_usuario_activo(usuario_o_correo))
+        
+        if not usuario:
+            raise ValueError("Usuario no encontrado")
+        
+        # Invalidar códigos anteriores
+        codigos_anteriores = await db.scalars(select(RecuperacionContraseña).where(
+            RecuperacionContraseña.usuario_id == usuario.id,
+            RecuperacionContraseña.utilizado == False,
+            RecuperacionContraseña.expiracion > datetime.now()
+        ))
+        
+        for codigo_ant in codigos_anteriores:
+            codigo_ant.utilizado = True
+        
+        codigo = ''.join(random.choices(string.digits, k=6))
+        
+        recuperacion = RecuperacionContraseña(
+            usuario_id=usuario.id,
+            codigo=codigo,
+            expiracion=datetime.now() + timedelta(minutes=15)
+        )
+        
+        db.add(recuperacion)
+        await db.commit()
+        
+        # El envío SMTP bloquea: se hace en un hilo aparte
+        return await asyncio.to_thread(AuthService._notificar_codigo, usuario, codigo)
+    
+    @staticmethod
+    async def validar_codigo_recuperacion_async(db: AsyncSession, usuario_o_correo: str, codigo: str, marcar_como_utilizado: bool = True):
+        """Validar código de recuperación"""
+        usuario = await db.scalar(AuthService._consulta_usuario_activo(usuario_o_correo))
+        
+        if not usuario:
+            raise ValueError("Usuario no encontrado")
+        
+        recuperacion = await db.scalar(select(RecuperacionContraseña).where(
+            RecuperacionContraseña.usuario_id == usuario.id,
+            RecuperacionContraseña.codigo == codigo,
+            RecuperacionContraseña.expiracion > datetime.now(),
+            RecuperacionContraseña.utilizado == False
+        ))
+        
+        if not recuperacion:
+            usado = await db.scalar(select(RecuperacionContraseña).where(
+                RecuperacionContraseña.usuario_id == usuario.id,
+                RecuperacionContraseña.codigo == codigo,
+                RecuperacionContraseña.utilizado == True
+            ))
+            
+            if usado:
+                raise ValueError("Este código ya fue utilizado")
+            else:
+                raise ValueError("Código inválido o expirado")
+        
+        if marcar_como_utilizado:
+            recuperacion.utilizado = True
+            await db.commit()
+        
+        return usuario.id
+    
+    @staticmethod
+    async def cambiar_contraseña_async(db: AsyncSession, usuario_id: int, nueva_contraseña: str, codigo_recuperacion: str = None):
+        """Cambiar contraseña de usuario"""
+        usuario = await db.get(Usuario, usuario_id)
+        
+        if not usuario:
+            raise ValueError("Usuario no encontrado")
+        
+        if len(nueva_contraseña) < 6:
+            raise ValueError("La contraseña debe tener al menos 6 caracteres")
+        
+        if codigo_recuperacion:
+            recuperacion = await db.scalar(select(RecuperacionContraseña).where(
+                RecuperacionContraseña.usuario_id == usuario_id,
+                RecuperacionContraseña.codigo == codigo_recuperacion,
+                RecuperacionContraseña.expiracion > datetime.now()
+            ))
+            
+            if not recuperacion:
+                raise ValueError("Código de recuperación no válido o expirado")
+            
+            recuperacion.utilizado = True
+        
+        usuario.contraseña = nueva_contraseña
+        await db.commit()
+        
+        logger.info(f"✅ Contraseña cambiada para usuario ID: {usuario_id}")
+        return True
+    
+    @staticmethod
+    async def obtener_usuario_por_id_async(db: AsyncSession, usuario_id: int):
+        """Obtener usuario por ID"""
+        return await db.get(Usuario, usuario_id)
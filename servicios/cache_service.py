@@ -0,0 +1,198 @@
+# servicios/cache_service.py
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+# Valor devuelto cuando la clave no está en la caché (None puede ser un valor válido)
+AUSENTE = object()
+
+
+class CacheLRU:
+    """Caché en memoria de tamaño acotado con expulsión LRU y caducidad opcional"""
+
+    def __init__(self, max_entradas: int = 256):
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> Any:
+        with self._lock:
+            if clave not in self._datos:
+                return AUSENTE
+            valor, expira = self._datos[clave]
+            if expira is not None and expira < time.time():
+                del self._datos[clave]
+                return AUSENTE
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: str, valor: Any, ttl: Optional[float] = None):
+        expira = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._datos[clave] = (valor, expira)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class CacheDisco:
+    """Caché persistente en SQLite (sobrevive a reinicios) con expulsión por último uso y caducidad"""
+
+    def __init__(self, ruta: str, max_entradas: int = 5000):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False, timeout=5)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "clave TEXT PRIMARY KEY, valor TEXT NOT NULL, usado REAL NOT NULL, expira REAL)"
+        )
+        columnas = [fila[1] for fila in self._conexion.execute("PRAGMA table_info(cache)")]
+        if "expira" not in columnas:
+            self._conexion.execute("ALTER TABLE cache ADD COLUMN expira REAL")
+        self._conexion.commit()
+        self._inserciones = 0
+
+    def obtener(self, clave: str) -> Any:
+        return self.obtener_con_ttl(clave)[0]
+
+    def obtener_con_ttl(self, clave: str) -> tuple:
+        """Devolver (valor, segundos de vida restantes o None si no caduca)"""
+        ahora = time.time()
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT valor, expira FROM cache WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila is None:
+                return AUSENTE, None
+            if fila[1] is not None and fila[1] < ahora:
+                self._conexion.execute("DELETE FROM cache WHERE clave = ?", (clave,))
+                self._conexion.commit()
+                return AUSENTE, None
+            self._conexion.execute(
+                "UPDATE cache SET usado = ? WHERE clave = ?", (ahora, clave)
+            )
+            self._conexion.commit()
+            return json.loads(fila[0]), (fila[1] - ahora if fila[1] is not None else None)
+
+    def guardar(self, clave: str, valor: Any, ttl: Optional[float] = None):
+        expira = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO cache (clave, valor, usado, expira) VALUES (?, ?, ?, ?)",
+                (clave, json.dumps(valor), time.time(), expira)
+            )
+            self._inserciones += 1
+            # Expulsar por lotes para no contar filas en cada inserción
+            if self._inserciones % 50 == 0:
+                self._conexion.execute(
+                    "DELETE FROM cache WHERE expira < ?", (time.time(),)
+                )
+                self._conexion.execute(
+                    "DELETE FROM cache WHERE clave NOT IN "
+                    "(SELECT clave FROM cache ORDER BY usado DESC LIMIT ?)",
+                    (self.max_entradas,)
+                )
+            self._conexion.commit()
+
+
+class CacheDosNiveles:
+    """Memoria LRU delante de un nivel opcional en disco, con contadores de aciertos"""
+
+    def __init__(self, max_entradas: int = 256, ruta_disco: Optional[str] = None,
+                 max_entradas_disco: int = 5000):
+        self.memoria = CacheLRU(max_entradas)
+        self.ruta_disco = ruta_disco
+        self.max_entradas_disco = max_entradas_disco
+        self._disco: Optional[CacheDisco] = None
+        self._lock_disco = threading.Lock()
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self._lock_contadores = threading.Lock()
+
+    @property
+    def disco(self) -> Optional[CacheDisco]:
+        """Nivel en disco, abierto en el primer uso: importar el módulo no toca el sistema de archivos.
+        Si no se puede abrir (directorio de solo lectura) la caché sigue solo en memoria."""
+        if self._disco is None and self.ruta_disco:
+            with self._lock_disco:
+                if self._disco is None and self.ruta_disco:
+                    try:
+                        self._disco = CacheDisco(self.ruta_disco, self.max_entradas_disco)
+                    except (OSError, sqlite3.Error) as e:
+                        print(f"⚠️  Caché en disco no disponible ({self.ruta_disco}): {e}")
+                        self.ruta_disco = None
+        return self._disco
+
+    def obtener(self, clave: str) -> Any:
+        valor = self.memoria.obtener(clave)
+        if valor is not AUSENTE:
+            self._contar("aciertos_memoria")
+            return valor
+
+        return self._obtener_disco(clave)
+
+    async def obtener_async(self, clave: str) -> Any:
+        """obtener() desde el event loop: la memoria se consulta en el acto y el disco en un hilo"""
+        valor = self.memoria.obtener(clave)
+        if valor is not AUSENTE:
+            self._contar("aciertos_memoria")
+            return valor
+        if not self.ruta_disco:
+            self._contar("fallos")
+            return AUSENTE
+        # Abrir el nivel en disco (la primera vez) y consultarlo fuera del loop
+        return await asyncio.to_thread(self._obtener_disco, clave)
+
+    def _obtener_disco(self, clave: str) -> Any:
+        disco = self.disco
+        if disco is not None:
+            valor, restante = disco.obtener_con_ttl(clave)
+            if valor is not AUSENTE:
+                self._contar("aciertos_disco")
+                self.memoria.guardar(clave, valor, restante)
+                return valor
+
+        self._contar("fallos")
+        return AUSENTE
+
+    def _contar(self, contador: str):
+        with self._lock_contadores:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def guardar(self, clave: str, valor: Any, ttl: Optional[float] = None):
+        self.memoria.guardar(clave, valor, ttl)
+        self._guardar_disco(clave, valor, ttl)
+
+    async def guardar_async(self, clave: str, valor: Any, ttl: Optional[float] = None):
+        """guardar() desde el event loop: la escritura en SQLite (con commit) va a un hilo"""
+        self.memoria.guardar(clave, valor, ttl)
+        if self.ruta_disco:
+            await asyncio.to_thread(self._guardar_disco, clave, valor, ttl)
+
+    def _guardar_disco(self, clave: str, valor: Any, ttl: Optional[float]):
+        disco = self.disco
+        if disco is not None:
+            disco.guardar(clave, valor, ttl)
+
+    def estadisticas(self) -> dict:
+        aciertos = self.aciertos_memoria + self.aciertos_disco
+        consultas = aciertos + self.fallos
+        return {
+            "entradas_memoria": len(self.memoria),
+            "disco": bool(self.ruta_disco),
+            "aciertos_memoria": self.aciertos_memoria,
+            "aciertos_disco": self.aciertos_disco,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(aciertos / consultas, 3) if consultas else 0.0,
+        }
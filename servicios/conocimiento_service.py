@@ -0,0 +1,181 @@
+# servicios/conocimiento_service.py
+import os
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as TiempoAgotado
+from typing import Dict, Optional
+import aiohttp
+
+# Cliente HTTP para consultas de conocimiento (API de MediaWiki)
+WIKIPEDIA_API_URL = os.getenv("WIKIPEDIA_API_URL", "https://es.wikipedia.org/w/api.php")
+WIKIPEDIA_TIMEOUT = float(os.getenv("WIKIPEDIA_TIMEOUT", 4))
+WIKIPEDIA_CONEXIONES = int(os.getenv("WIKIPEDIA_CONEXIONES", 10))
+USER_AGENT = "AsistenteVirtual/2.0 (https://github.com/Mrr-kat/Asistente_proyect-2.0)"
+
+
+class ErrorConocimiento(Exception):
+    """Fallo de red, tiempo agotado o respuesta inesperada del servicio externo"""
+
+
+class ClienteConocimiento:
+    """Cliente asíncrono con pool de conexiones keep-alive, timeouts y coalescencia de
+    peticiones. Vive en un event loop propio para poder usarse desde los hilos de comandos."""
+
+    def __init__(self, url_api: str = WIKIPEDIA_API_URL, timeout: float = WIKIPEDIA_TIMEOUT,
+                 conexiones: int = WIKIPEDIA_CONEXIONES):
+        self.url_api = url_api
+        self.timeout = timeout
+        self.conexiones = conexiones
+        self._sesion: Optional[aiohttp.ClientSession] = None
+        self._en_vuelo: Dict[str, asyncio.Future] = {}
+        self._esperando: Dict[asyncio.Future, int] = {}
+        self.coalescidas = 0
+        self._loop = asyncio.new_event_loop()
+        self._hilo = threading.Thread(target=self._loop.run_forever, name="conocimiento", daemon=True)
+        self._hilo.start()
+
+    def resumen(self, consulta: str, frases: int = 2) -> dict:
+        """Versión síncrona de resumen_async para los hilos de comandos"""
+        # Dos peticiones HTTP como mucho, cada una con su propio timeout
+        limite = self.timeout * 3
+        futuro = self.precargar(consulta, frases)
+        try:
+            return futuro.result(timeout=limite)
+        except TiempoAgotado as e:
+            # Cancelar el futuro cancela la corrutina en el loop del cliente (y la petición
+            # HTTP si nadie más la espera) en lugar de dejarla corriendo
+            futuro.cancel()
+            raise ErrorConocimiento(f"Sin respuesta de {self.url_api} en {limite:g} s") from e
+
+    def precargar(self, consulta: str, frases: int = 2) -> Future:
+        """Lanzar la consulta sin esperarla; cancelar el futuro la aborta si nadie más la espera"""
+        return asyncio.run_coroutine_threadsafe(self.resumen_async(consulta, frases), self._loop)
+
+    async def resumen_async(self, consulta: str, frases: int = 2) -> dict:
+        """Resumen de la página que mejor coincide; las consultas idénticas simultáneas
+        comparten una única petición en curso"""
+        clave = f"{frases}:{consulta}"
+        tarea = self._en_vuelo.get(clave)
+        if tarea is not None:
+            self.coalescidas += 1
+        else:
+            tarea = asyncio.ensure_future(self._buscar(consulta, frases))
+            self._en_vuelo[clave] = tarea
+            self._esperando[tarea] = 0
+            tarea.add_done_callback(lambda _: self._terminar(clave, tarea))
+
+        self._esperando[tarea] += 1
+        try:
+            # shield: si un solicitante se cancela, los demás siguen esperando la misma tarea
+            return await asyncio.shield(tarea)
+        except asyncio.CancelledError:
+            # La petición solo se aborta cuando se cancela el último que la esperaba
+            if self._esperando.get(tarea) == 1 and not tarea.done():
+                tarea.cancel()
+            raise
+        finally:
+            if tarea in self._esperando:
+                self._esperando[tarea] -= 1
+
+    def _terminar(self, clave: str, tarea: asyncio.Future):
+        if self._en_vuelo.get(clave) is tarea:
+            del self._en_vuelo[clave]
+        self._esperando.pop(tarea, None)
+
+    async def _obtener_sesion(self) -> aiohttp.ClientSession:
+        if self._sesion is None or self._sesion.closed:
+            self._sesion = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.conexiones, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": USER_AGENT}
+            )
+        return self._sesion
+
+    async def _consultar_api(self, parametros: dict) -> dict:
+        sesion = await self._obtener_sesion()
+        parametros = {"format": "json", "formatversion": 2, **parametros}
+        try:
+            async with sesion.get(self.url_api, params=parametros) as respuesta:
+                respuesta.raise_for_status()
+                return await respuesta.json(content_type=None)
+        except asyncio.TimeoutError as e:
+            raise ErrorConocimiento(f"Tiempo de espera agotado ({self.timeout:g} s)") from e
+        except aiohttp.ClientError as e:
+            raise ErrorConocimiento(f"Error de conexión: {e}") from e
+
+    async def _buscar(self, consulta: str, frases: int) -> dict:
+        busqueda = await self._consultar_api({
+            "action": "query",
+            "list": "search",
+            "srsearch": consulta,
+            "srlimit": 1,
+            "srprop": "",
+        })
+        resultados = busqueda.get("query", {}).get("search", [])
+        if not resultados:
+            return {"tipo": "no_encontrado", "texto": "", "opciones": []}
+        titulo = resultados[0]["title"]
+
+        # Extracto y marca de desambiguación en una sola petición
+        paginas = await self._consultar_api({
+            "action": "query",
+            "prop": "extracts|pageprops|links",
+            "ppprop": "disambiguation",
+            "exintro": 1,
+            "explaintext": 1,
+            "exsentences": frases,
+            "plnamespace": 0,
+            "pllimit": 3,
+            "redirects": 1,
+            "titles": titulo,
+        })
+        pagina = (paginas.get("query", {}).get("pages") or [{}])[0]
+        if not pagina or pagina.get("missing"):
+            return {"tipo": "no_encontrado", "texto": "", "opciones": []}
+
+        if "disambiguation" in pagina.get("pageprops", {}):
+            opciones = [enlace["title"] for enlace in pagina.get("links", [])][:3]
+            return {"tipo": "desambiguacion", "texto": "", "opciones": opciones}
+
+        texto = (pagina.get("extract") or "").strip()
+        if not texto:
+            return {"tipo": "no_encontrado", "texto": "", "opciones": []}
+        return {"tipo": "resumen", "texto": texto, "opciones": []}
+
+    def cerrar(self):
+        """Cerrar el pool de conexiones y detener el event loop del cliente"""
+        async def _cerrar():
+            if self._sesion is not None and not self._sesion.closed:
+                await self._sesion.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_cerrar(), self._loop).result(timeout=5)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def estadisticas(self) -> dict:
+        return {
+            "en_vuelo": len(self._en_vuelo),
+            "coalescidas": self.coalescidas,
+        }
+
+
+_cliente: Optional[ClienteConocimiento] = None
+_lock = threading.Lock()
+
+
+def cliente_conocimiento() -> ClienteConocimiento:
+    """Devolver el cliente compartido, creándolo la primera vez"""
+    global _cliente
+    with _lock:
+        if _cliente is None:
+            _cliente = ClienteConocimiento()
+        return _cliente
+
+
+def cerrar_cliente_conocimiento():
+    global _cliente
+    with _lock:
+        if _cliente is not None:
+            _cliente.cerrar()
+            _cliente = None
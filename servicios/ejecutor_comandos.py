@@ -0,0 +1,145 @@
+# servicios/ejecutor_comandos.py
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Optional, Set
+from servicios.admision_service import SaturadoError
+from servicios.metricas import RegistroLatencias
+
+# Pool fijo para ejecutar comandos (configurable por variables de entorno)
+COMANDOS_HILOS = int(os.getenv("COMANDOS_HILOS", 4))
+COMANDOS_MAX_EN_COLA = int(os.getenv("COMANDOS_MAX_EN_COLA", 32))
+COMANDOS_TIMEOUT = float(os.getenv("COMANDOS_TIMEOUT", 20))
+COMANDOS_DRENAJE = float(os.getenv("COMANDOS_DRENAJE", 10))
+
+
+class ComandoExpiradoError(TimeoutError):
+    """El comando no terminó dentro del tiempo límite"""
+
+
+def _ejecutar_con_db(texto: str, usuario_id: Optional[int], limite: Optional[float] = None) -> dict:
+    """Ejecutar el comando con una sesión de BD propia del hilo"""
+    from db.models import get_db
+    from funciones.comandos import procesar_comando
+
+    db_local = next(get_db())
+    try:
+        return procesar_comando(texto, db_local, usuario_id, limite)
+    finally:
+        db_local.close()
+
+
+class EjecutorComandos:
+    """Pool supervisado de hilos para ejecutar comandos con límite de cola y de tiempo"""
+
+    def __init__(self, hilos: int = COMANDOS_HILOS, max_en_cola: int = COMANDOS_MAX_EN_COLA,
+                 timeout: float = COMANDOS_TIMEOUT):
+        self.hilos = hilos
+        self.max_en_cola = max_en_cola
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="comando")
+        self._lock = threading.Lock()
+        self._futuros: Set[Future] = set()
+        self._cerrando = False
+        self.activas = 0
+        self.en_cola = 0
+        self.completadas = 0
+        self.fallidas = 0
+        self.expiradas = 0
+        self.canceladas = 0
+        self.rechazadas = 0
+        self.latencias = RegistroLatencias()
+
+    def enviar(self, texto: str, usuario_id: Optional[int] = None,
+               timeout: Optional[float] = None) -> Future:
+        """Encolar un comando; lanza SaturadoError si la cola está llena"""
+        limite = time.monotonic() + (timeout or self.timeout)
+
+        with self._lock:
+            if self._cerrando:
+                raise SaturadoError("El servidor se está cerrando.", reintentar_en=5)
+            if self.en_cola >= self.max_en_cola:
+                self.rechazadas += 1
+                raise SaturadoError("Demasiados comandos en espera, inténtalo de nuevo.", reintentar_en=2)
+            self.en_cola += 1
+
+        futuro = self._pool.submit(self._ejecutar, texto, usuario_id, limite)
+        with self._lock:
+            self._futuros.add(futuro)
+        futuro.add_done_callback(self._al_terminar)
+        return futuro
+
+    async def ejecutar(self, texto: str, usuario_id: Optional[int] = None,
+                       timeout: Optional[float] = None) -> dict:
+        """Encolar un comando y esperar su resultado desde el event loop"""
+        timeout = timeout or self.timeout
+        return await self.esperar(self.enviar(texto, usuario_id, timeout), timeout)
+
+    async def esperar(self, futuro: Future, timeout: Optional[float] = None) -> dict:
+        """Esperar un comando ya encolado, cancelándolo si supera el tiempo límite"""
+        timeout = timeout or self.timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(futuro), timeout=timeout)
+        except asyncio.TimeoutError:
+            # Si aún no empezó se cancela; si ya corre, su resultado se descarta
+            futuro.cancel()
+            with self._lock:
+                self.expiradas += 1
+            raise ComandoExpiradoError(f"El comando tardó más de {timeout:g} s")
+
+    def _ejecutar(self, texto: str, usuario_id: Optional[int], limite: float) -> dict:
+        with self._lock:
+            self.en_cola -= 1
+            self.activas += 1
+        inicio = time.perf_counter()
+        exito = False
+        try:
+            if time.monotonic() > limite:
+                raise ComandoExpiradoError("El comando expiró esperando en la cola")
+            resultado = _ejecutar_con_db(texto, usuario_id, limite)
+            exito = True
+            return resultado
+        finally:
+            self.latencias.registrar("comando", time.perf_counter() - inicio, exito)
+            with self._lock:
+                self.activas -= 1
+                if exito:
+                    self.completadas += 1
+                else:
+                    self.fallidas += 1
+
+    def _al_terminar(self, futuro: Future):
+        with self._lock:
+            self._futuros.discard(futuro)
+            if futuro.cancelled():
+                # Cancelado antes de empezar: nunca pasó por _ejecutar
+                self.en_cola -= 1
+                self.canceladas += 1
+
+    def cerrar(self, espera: float = COMANDOS_DRENAJE):
+        """Dejar de aceptar comandos y esperar a los que están en curso"""
+        with self._lock:
+            self._cerrando = True
+            pendientes = set(self._futuros)
+
+        if pendientes:
+            print(f"⏳ Esperando {len(pendientes)} comando(s) antes de cerrar...")
+            wait(pendientes, timeout=espera)
+
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "hilos": self.hilos,
+                "activas": self.activas,
+                "en_cola": self.en_cola,
+                "completadas": self.completadas,
+                "fallidas": self.fallidas,
+                "expiradas": self.expiradas,
+                "canceladas": self.canceladas,
+                "rechazadas": self.rechazadas,
+                "latencias": self.latencias.resumen(),
+            }
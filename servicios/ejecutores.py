@@ -0,0 +1,75 @@
+# servicios/ejecutores.py
+import os
+import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+# Tamaño de los pools (configurable por variables de entorno)
+# - ASR_HILOS: hilos para el reconocimiento de voz (espera de red / E/S)
+# - DECODIFICACION_PROCESOS: procesos para decodificar audio (CPU);
+#   con 0 la decodificación usa el pool de hilos
+ASR_HILOS = int(os.getenv("ASR_HILOS", 4))
+DECODIFICACION_PROCESOS = int(os.getenv("DECODIFICACION_PROCESOS", 2))
+
+_pool_asr = None
+_pool_decodificacion = None
+_lock = threading.Lock()
+
+
+def pool_asr() -> Executor:
+    """Pool de hilos para el reconocimiento de voz"""
+    global _pool_asr
+    with _lock:
+        if _pool_asr is None:
+            _pool_asr = ThreadPoolExecutor(max_workers=ASR_HILOS, thread_name_prefix="asr")
+        return _pool_asr
+
+
+def pool_decodificacion() -> Executor:
+    """Pool de procesos para la decodificación de audio"""
+    global _pool_decodificacion
+    if DECODIFICACION_PROCESOS <= 0:
+        return pool_asr()
+    with _lock:
+        if _pool_decodificacion is None:
+            _pool_decodificacion = ProcessPoolExecutor(max_workers=DECODIFICACION_PROCESOS)
+        return _pool_decodificacion
+
+
+def reiniciar_pool_decodificacion(roto: Executor) -> Executor:
+    """Sustituir el pool de procesos roto por uno nuevo (si otra petición no lo ha hecho ya)"""
+    global _pool_decodificacion
+    with _lock:
+        if _pool_decodificacion is roto:
+            print("⚠️  Un proceso de decodificación terminó de forma inesperada; se crea un pool nuevo")
+            _pool_decodificacion = None
+            roto.shutdown(wait=False, cancel_futures=True)
+    return pool_decodificacion()
+
+
+async def ejecutar_en_pool(pool: Executor, funcion, *args, **kwargs):
+    """Ejecutar una función bloqueante en el pool y esperarla sin bloquear el event loop"""
+    loop = asyncio.get_running_loop()
+    llamada = partial(funcion, *args, **kwargs)
+    try:
+        return await loop.run_in_executor(pool, llamada)
+    except BrokenProcessPool:
+        # Si muere un proceso (falta de memoria, fallo de libav) el pool queda inservible para
+        # siempre: se reinicia y se reintenta una vez
+        if not isinstance(pool, ProcessPoolExecutor):
+            raise
+        return await loop.run_in_executor(reiniciar_pool_decodificacion(pool), llamada)
+
+
+def cerrar_ejecutores():
+    """Cerrar los pools esperando a que terminen las tareas en curso"""
+    global _pool_asr, _pool_decodificacion
+    with _lock:
+        if _pool_decodificacion is not None:
+            _pool_decodificacion.shutdown(wait=True)
+            _pool_decodificacion = None
+        if _pool_asr is not None:
+            _pool_asr.shutdown(wait=True)
+            _pool_asr = None
@@ -1,13 +1,28 @@
 # servicios/historial_service.py
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.units import inch
+import os
+import re
+import base64
+from sqlalchemy import select, func, table, column, literal_column, tuple_
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from db.models import HistorialInteraccion
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+# Paginación por cursor (fecha_hora, id): cada página cuesta lo mismo sin importar su antigüedad
+HISTORIAL_PAGINA = int(os.getenv("HISTORIAL_PAGINA", 20))
+HISTORIAL_PAGINA_MAX = 100
+
+# Búsqueda de texto completo sobre el índice FTS5 (ver db/migraciones.py)
+HISTORIAL_BUSQUEDA_LIMITE = int(os.getenv("HISTORIAL_BUSQUEDA_LIMITE", 50))
+# Marcas de los términos encontrados en los fragmentos; el cliente escapa el texto y las
+# convierte en <mark>. Son caracteres de control que no aparecen en el texto dictado.
+FRAGMENTO_INICIO = "\x02"
+FRAGMENTO_FIN = "\x03"
+
+_fts = table("historial_fts", column("rowid"))
+_fts_tabla = literal_column("historial_fts")
 
 class HistorialService:
     
@@ -54,6 +69,95 @@ class HistorialService:
         
         return query.order_by(HistorialInteraccion.fecha_hora.desc()).all()
     
+    @staticmethod
+    def obtener_pagina(db: Session, usuario_id: Optional[int] = None, cursor: Optional[str] = None,
+                       limite: int = HISTORIAL_PAGINA) -> Tuple[List[HistorialInteraccion], Optional[str]]:
+        """Página del historial (más recientes primero) y cursor de la siguiente"""
+        limite = HistorialService._limite_pagina(limite)
+        registros = list(db.scalars(HistorialService._consulta_pagina(usuario_id, cursor, limite)))
+        return HistorialService._cortar_pagina(registros, limite)
+
+    @staticmethod
+    def _limite_pagina(limite: int) -> int:
+        return max(1, min(limite, HISTORIAL_PAGINA_MAX))
+
+    @staticmethod
+    def _consulta_pagina(usuario_id: Optional[int], cursor: Optional[str], limite: int):
+        # Orden total (fecha_hora, id) en el mismo sentido que el índice compuesto: las páginas
+        # siguientes empiezan justo después del último registro entregado, sin OFFSET
+        consulta = HistorialService._consulta(usuario_id)
+        if cursor:
+            fecha_hora, registro_id = HistorialService._decodificar_cursor(cursor)
+            consulta = consulta.where(
+                tuple_(HistorialInteraccion.fecha_hora, HistorialInteraccion.id) < tuple_(fecha_hora, registro_id)
+            )
+        # Un registro de más para saber si hay otra página
+        return consulta.order_by(
+            HistorialInteraccion.fecha_hora.desc(), HistorialInteraccion.id.desc()
+        ).limit(limite + 1)
+
+    @staticmethod
+    def _cortar_pagina(registros: List[HistorialInteraccion], limite: int):
+        if len(registros) <= limite:
+            return registros, None
+        registros = registros[:limite]
+        return registros, HistorialService._codificar_cursor(registros[-1])
+
+    @staticmethod
+    def _codificar_cursor(registro: HistorialInteraccion) -> str:
+        crudo = f"{registro.fecha_hora.isoformat()}|{registro.id}".encode()
+        return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+    @staticmethod
+    def _decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+        try:
+            crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            fecha_hora, registro_id = crudo.split("|")
+            return datetime.fromisoformat(fecha_hora), int(registro_id)
+        except ValueError:
+            raise ValueError("Cursor de paginación inválido")
+
+    @staticmethod
+    def buscar_texto_completo(db: Session, texto: str, usuario_id: Optional[int] = None,
+                              limite: int = HISTORIAL_BUSQUEDA_LIMITE) -> List[dict]:
+        """Buscar en comando y respuesta con el índice FTS5, por relevancia y con fragmentos"""
+        expresion = HistorialService._expresion_fts(texto)
+        if expresion:
+            try:
+                filas = db.execute(HistorialService._consulta_fts(expresion, usuario_id, limite))
+                return HistorialService._resultados_fts(filas.all())
+            except OperationalError as e:
+                db.rollback()
+                print(f"⚠️ Búsqueda FTS5 no disponible, usando LIKE: {e.orig}")
+        return [r.to_dict() for r in HistorialService.buscar_por_texto(db, texto, usuario_id)[:limite]]
+
+    @staticmethod
+    def _expresion_fts(texto: str) -> Optional[str]:
+        """Cada palabra como prefijo entre comillas: el texto del usuario no se interpreta como sintaxis FTS5"""
+        return " ".join(f'"{palabra}"*' for palabra in re.findall(r"\w+", texto)) or None
+
+    @staticmethod
+    def _consulta_fts(expresion: str, usuario_id: Optional[int], limite: int):
+        # bm25: menor es más relevante; el comando pesa el doble que la respuesta
+        return (
+            HistorialService._consulta(usuario_id)
+            .add_columns(
+                func.snippet(_fts_tabla, 0, FRAGMENTO_INICIO, FRAGMENTO_FIN, "…", 12),
+                func.snippet(_fts_tabla, 1, FRAGMENTO_INICIO, FRAGMENTO_FIN, "…", 20),
+            )
+            .join(_fts, _fts.c.rowid == HistorialInteraccion.id)
+            .where(_fts_tabla.op("MATCH")(expresion))
+            .order_by(func.bm25(_fts_tabla, 2.0, 1.0), HistorialInteraccion.fecha_hora.desc())
+            .limit(limite)
+        )
+
+    @staticmethod
+    def _resultados_fts(filas) -> List[dict]:
+        return [
+            dict(registro.to_dict(), fragmentos={"comando_usuario": comando, "respuesta_asistente": respuesta})
+            for registro, comando, respuesta in filas
+        ]
+
     @staticmethod
     def obtener_por_id(db: Session, registro_id: int, usuario_id: Optional[int] = None):
         """Obtener un registro específico por ID"""
@@ -138,9 +242,123 @@ class HistorialService:
             "comandos_populares": [{"comando": c[0], "cantidad": c[1]} for c in comandos_populares]
         }
     
+    # ====== VERSIONES ASÍNCRONAS (handlers de FastAPI) ======
+
+    @staticmethod
+    def _consulta(usuario_id: Optional[int] = None, solo_activos: bool = True):
+        consulta = select(HistorialInteraccion)
+        if usuario_id is not None:
+            consulta = consulta.where(HistorialInteraccion.usuario_id == usuario_id)
+        if solo_activos:
+            consulta = consulta.where(HistorialInteraccion.activo == True)
+        return consulta
+
+    @staticmethod
+    async def crear_registro_async(db: AsyncSession, comando_usuario: str, comando_ejecutado: str,
+                                   respuesta_asistente: str, usuario_id: Optional[int] = None):
+        """Crear un nuevo registro en el historial"""
+        registro = HistorialInteraccion(
+            comando_usuario=comando_usuario,
+            comando_ejecutado=comando_ejecutado,
+            respuesta_asistente=respuesta_asistente,
+            usuario_id=usuario_id
+        )
+        db.add(registro)
+        await db.commit()
+        await db.refresh(registro)
+        return registro
+
+    @staticmethod
+    async def obtener_todos_async(db: AsyncSession, usuario_id: Optional[int] = None,
+                                  solo_activos: bool = True) -> List[HistorialInteraccion]:
+        """Obtener todos los registros del historial"""
+        consulta = HistorialService._consulta(usuario_id, solo_activos)
+        return list(await db.scalars(consulta.order_by(HistorialInteraccion.fecha_hora.desc())))
+
+    @staticmethod
+    async def buscar_por_texto_async(db: AsyncSession, texto: str, usuario_id: Optional[int] = None,
+                                     solo_activos: bool = True) -> List[HistorialInteraccion]:
+        """Buscar registros por texto en el comando del usuario"""
+        consulta = HistorialService._consulta(usuario_id, solo_activos).where(
+            HistorialInteraccion.comando_usuario.ilike(f"%{texto}%")
+        )
+        return list(await db.scalars(consulta.order_by(HistorialInteraccion.fecha_hora.desc())))
+
+    @staticmethod
+    async def obtener_pagina_async(db: AsyncSession, usuario_id: Optional[int] = None, cursor: Optional[str] = None,
+                                   limite: int = HISTORIAL_PAGINA) -> Tuple[List[HistorialInteraccion], Optional[str]]:
+        """Página del historial (más recientes primero) y cursor de la siguiente"""
+        limite = HistorialService._limite_pagina(limite)
+        registros = list(await db.scalars(HistorialService._consulta_pagina(usuario_id, cursor, limite)))
+        return HistorialService._cortar_pagina(registros, limite)
+
+    @staticmethod
+    async def buscar_texto_completo_async(db: AsyncSession, texto: str, usuario_id: Optional[int] = None,
+                                          limite: int = HISTORIAL_BUSQUEDA_LIMITE) -> List[dict]:
+        """Buscar en comando y respuesta con el índice FTS5, por relevancia y con fragmentos"""
+        expresion = HistorialService._expresion_fts(texto)
+        if expresion:
+            try:
+                filas = await db.execute(HistorialService._consulta_fts(expresion, usuario_id, limite))
+                return HistorialService._resultados_fts(filas.all())
+            except OperationalError as e:
+                await db.rollback()
+                print(f"⚠️ Búsqueda FTS5 no disponible, usando LIKE: {e.orig}")
+        registros = await HistorialService.buscar_por_texto_async(db, texto, usuario_id)
+        return [r.to_dict() for r in registros[:limite]]
+
+    @staticmethod
+    async def obtener_por_id_async(db: AsyncSession, registro_id: int, usuario_id: Optional[int] = None):
+        """Obtener un registro específico por ID"""
+        consulta = HistorialService._consulta(usuario_id, solo_activos=False).where(
+            HistorialInteraccion.id == registro_id
+        )
+        return await db.scalar(consulta)
+
+    @staticmethod
+    async def actualizar_registro_async(db: AsyncSession, registro_id: int, comando_usuario: str = None,
+                                        respuesta_asistente: str = None, usuario_id: Optional[int] = None):
+        """Actualizar un registro existente"""
+        registro = await HistorialService.obtener_por_id_async(db, registro_id, usuario_id)
+        if registro:
+            if comando_usuario is not None:
+                registro.comando_usuario = comando_usuario
+            if respuesta_asistente is not None:
+                registro.respuesta_asistente = respuesta_asistente
+            await db.commit()
+            await db.refresh(registro)
+        return registro
+
+    @staticmethod
+    async def eliminar_registro_async(db: AsyncSession, registro_id: int, usuario_id: Optional[int] = None):
+        """Eliminación lógica de un registro (cambia estado activo a False)"""
+        registro = await HistorialService.obtener_por_id_async(db, registro_id, usuario_id)
+        if registro:
+            registro.activo = False
+            await db.commit()
+            return True
+        return False
+
+    @staticmethod
+    async def restaurar_registro_async(db: AsyncSession, registro_id: int, usuario_id: Optional[int] = None):
+        """Restaurar un registro eliminado (cambia estado activo a True)"""
+        registro = await HistorialService.obtener_por_id_async(db, registro_id, usuario_id)
+        if registro:
+            registro.activo = True
+            await db.commit()
+            return True
+        return False
+
     @staticmethod
     def generar_reporte_pdf(db: Session, ruta_archivo: str, usuario_id: Optional[int] = None):
         """Generar reporte en formato PDF"""
+        # reportlab solo se carga cuando se pide un reporte
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib import colors
+        from reportlab.lib.units import inch
+
         registros = HistorialService.obtener_todos(db, usuario_id, solo_activos=True)
         
         # Crear el documento PDF
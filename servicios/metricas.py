@@ -0,0 +1,51 @@
+# servicios/metricas.py
+import threading
+from collections import deque
+from typing import Dict
+
+
+class RegistroLatencias:
+    """Latencias por nombre (motor, etapa...) con percentiles sobre las últimas muestras"""
+
+    def __init__(self, max_muestras: int = 500):
+        self.max_muestras = max_muestras
+        self._datos: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nombre: str, segundos: float, exito: bool = True):
+        with self._lock:
+            datos = self._datos.setdefault(nombre, {
+                "total": 0,
+                "errores": 0,
+                "suma": 0.0,
+                "maximo": 0.0,
+                "muestras": deque(maxlen=self.max_muestras),
+            })
+            datos["total"] += 1
+            if not exito:
+                datos["errores"] += 1
+            datos["suma"] += segundos
+            datos["maximo"] = max(datos["maximo"], segundos)
+            datos["muestras"].append(segundos)
+
+    def resumen(self) -> Dict[str, dict]:
+        with self._lock:
+            resultado = {}
+            for nombre, datos in self._datos.items():
+                muestras = sorted(datos["muestras"])
+                resultado[nombre] = {
+                    "total": datos["total"],
+                    "errores": datos["errores"],
+                    "media_ms": round(datos["suma"] / datos["total"] * 1000, 2),
+                    "p50_ms": round(self._percentil(muestras, 0.50) * 1000, 2),
+                    "p95_ms": round(self._percentil(muestras, 0.95) * 1000, 2),
+                    "max_ms": round(datos["maximo"] * 1000, 2),
+                }
+            return resultado
+
+    @staticmethod
+    def _percentil(muestras, fraccion: float) -> float:
+        if not muestras:
+            return 0.0
+        indice = min(len(muestras) - 1, int(round(fraccion * (len(muestras) - 1))))
+        return muestras[indice]
@@ -0,0 +1,165 @@
+# servicios/streaming_service.py
+import os
+import time
+import asyncio
+from contextlib import nullcontext
+from typing import Awaitable, Callable, Optional
+from servicios.admision_service import ControlAdmision, SaturadoError
+from servicios.audio_service import AUDIO_MAX_BYTES, AudioDemasiadoLargoError
+from servicios.transcripcion_service import TranscripcionService
+from servicios.wikipedia_service import WikipediaService
+from funciones.intenciones import clasificar
+
+# Segundos mínimos entre dos transcripciones parciales de la misma grabación
+STREAMING_INTERVALO_PARCIAL = float(os.getenv("STREAMING_INTERVALO_PARCIAL", 1.0))
+# Cada parcial decodifica el buffer completo: audio nuevo mínimo (bytes) y máximo de parciales por grabación
+STREAMING_MIN_BYTES_PARCIAL = int(os.getenv("STREAMING_MIN_BYTES_PARCIAL", 4 * 1024))
+STREAMING_MAX_PARCIALES = int(os.getenv("STREAMING_MAX_PARCIALES", 8))
+# Precargar las consultas de conocimiento ("dime ...") a partir de las transcripciones parciales
+STREAMING_ESPECULAR = os.getenv("STREAMING_ESPECULAR", "true").lower() == "true"
+
+# Contadores de la precarga especulativa (para /metricas)
+especulacion = {"lanzadas": 0, "aprovechadas": 0, "canceladas": 0}
+# Transcripciones parciales hechas y omitidas por falta de hueco en el control de admisión
+parciales = {"transcritas": 0, "omitidas": 0}
+
+
+class SesionStreaming:
+    """Grabación en curso de un cliente Socket.IO que envía el audio por fragmentos.
+
+    Las transcripciones comparten el control de admisión de /audio: la final espera su turno
+    como una subida y las parciales solo se hacen si hay un hueco libre en ese momento.
+    """
+
+    def __init__(self, usuario_id: Optional[int] = None, control: Optional[ControlAdmision] = None):
+        self.usuario_id = usuario_id
+        self.control = control
+        self.buffer = bytearray()
+        self.ultimo_parcial = ""
+        self.bytes_parcial = 0
+        self.num_parciales = 0
+        self.tarea_parcial: Optional[asyncio.Task] = None
+        self.ultimo_lanzamiento = 0.0
+        self.clave_especulada: Optional[str] = None
+        self.tarea_especulativa: Optional[asyncio.Task] = None
+
+    def agregar(self, fragmento: bytes):
+        """Añadir un fragmento de audio respetando el tamaño máximo"""
+        if len(self.buffer) + len(fragmento) > AUDIO_MAX_BYTES:
+            raise AudioDemasiadoLargoError(
+                f"El audio supera el tamaño máximo permitido ({AUDIO_MAX_BYTES // 1024} KB)"
+            )
+        self.buffer.extend(fragmento)
+
+    def programar_parcial(self, al_transcribir: Callable[[str], Awaitable[None]]):
+        """Lanzar una transcripción parcial si no hay otra en curso, hay audio nuevo suficiente
+        y queda capacidad: las parciales nunca hacen cola detrás de las subidas completas"""
+        if self.tarea_parcial is not None and not self.tarea_parcial.done():
+            return
+        if self.num_parciales >= STREAMING_MAX_PARCIALES:
+            return
+        if len(self.buffer) - self.bytes_parcial < STREAMING_MIN_BYTES_PARCIAL:
+            return
+        if time.monotonic() - self.ultimo_lanzamiento < STREAMING_INTERVALO_PARCIAL:
+            return
+        if self.control is not None and not self.control.libre():
+            parciales["omitidas"] += 1
+            return
+
+        self.ultimo_lanzamiento = time.monotonic()
+        self.num_parciales += 1
+        self.tarea_parcial = asyncio.create_task(self._transcribir_parcial(al_transcribir))
+
+    async def _transcribir_parcial(self, al_transcribir: Callable[[str], Awaitable[None]]):
+        contenido = bytes(self.buffer)
+        try:
+            async with self._admitir(esperar=False):
+                texto = await TranscripcionService.transcribir(contenido, usar_cache=False)
+        except SaturadoError:
+            # Otra petición ocupó el último hueco entre la comprobación y el inicio de la tarea
+            parciales["omitidas"] += 1
+            return
+        except Exception:
+            # Un fragmento incompleto o sin voz no es un error de la grabación
+            return
+
+        parciales["transcritas"] += 1
+        self.ultimo_parcial = texto
+        self.bytes_parcial = len(contenido)
+        if texto:
+            self._especular(texto)
+            await al_transcribir(texto)
+
+    def _especular(self, texto: str):
+        """Precargar en la caché la consulta que sugiere la transcripción parcial"""
+        if not STREAMING_ESPECULAR:
+            return
+        clasificacion = clasificar(texto)
+        if clasificacion.intencion != "dime" or not clasificacion.argumento:
+            return
+        clave = WikipediaService.clave(clasificacion.argumento)
+        if clave == self.clave_especulada:
+            return
+
+        # La parcial cambió: la consulta anterior ya no sirve
+        self._cancelar_especulacion()
+        self.clave_especulada = clave
+        self.tarea_especulativa = asyncio.create_task(self._precargar(clasificacion.argumento))
+        especulacion["lanzadas"] += 1
+
+    async def _precargar(self, consulta: str):
+        try:
+            await WikipediaService.resumen_async(consulta, especulativa=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # El comando real repetirá la consulta e informará del error
+            pass
+
+    def _resolver_especulacion(self, texto: str):
+        """Conservar la precarga si la transcripción final pide lo mismo; cancelarla si no"""
+        if self.tarea_especulativa is None:
+            return
+        clasificacion = clasificar(texto)
+        if clasificacion.intencion == "dime" and WikipediaService.clave(clasificacion.argumento) == self.clave_especulada:
+            # El comando la encontrará en la caché o se unirá a la petición en curso
+            especulacion["aprovechadas"] += 1
+        else:
+            self._cancelar_especulacion()
+
+    def _cancelar_especulacion(self):
+        if self.tarea_especulativa is not None and not self.tarea_especulativa.done():
+            self.tarea_especulativa.cancel()
+            especulacion["canceladas"] += 1
+        self.tarea_especulativa = None
+        self.clave_especulada = None
+
+    async def finalizar(self) -> str:
+        """Obtener la transcripción final reutilizando la última parcial si cubre todo el audio"""
+        if self.tarea_parcial is not None:
+            try:
+                await self.tarea_parcial
+            except asyncio.CancelledError:
+                pass
+
+        try:
+            if self.ultimo_parcial and self.bytes_parcial == len(self.buffer):
+                texto = self.ultimo_parcial
+            else:
+                async with self._admitir():
+                    texto = await TranscripcionService.transcribir(bytes(self.buffer))
+        except BaseException:
+            self._cancelar_especulacion()
+            raise
+
+        self._resolver_especulacion(texto)
+        return texto
+
+    def _admitir(self, esperar: bool = True):
+        return self.control.admitir(esperar) if self.control is not None else nullcontext()
+
+    def cancelar(self):
+        """Cancelar la transcripción parcial en curso (p. ej. al desconectarse el cliente)"""
+        if self.tarea_parcial is not None and not self.tarea_parcial.done():
+            self.tarea_parcial.cancel()
+        self._cancelar_especulacion()
@@ -0,0 +1,62 @@
+# servicios/transcripcion_service.py
+import os
+import hashlib
+import speech_recognition as sr
+from servicios.audio_service import (AudioService, AudioDemasiadoLargoError, AudioSinVozError,
+                                     AUDIO_PREPROCESAR, decodificador_activo)
+from servicios.asr_service import obtener_motor, ASR_MOTOR, ASR_IDIOMA
+from servicios.cache_service import CacheDosNiveles, AUSENTE
+from servicios.ejecutores import pool_asr, pool_decodificacion, ejecutar_en_pool
+
+# Caché de transcripciones por hash del audio subido (reintentos del mismo blob)
+TRANSCRIPCIONES_CACHE_MAX = int(os.getenv("TRANSCRIPCIONES_CACHE_MAX", 256))
+TRANSCRIPCIONES_CACHE_DB = os.getenv("TRANSCRIPCIONES_CACHE_DB", "")
+
+cache_transcripciones = CacheDosNiveles(
+    max_entradas=TRANSCRIPCIONES_CACHE_MAX,
+    ruta_disco=TRANSCRIPCIONES_CACHE_DB or None
+)
+
+
+class ErrorConversionAudio(Exception):
+    """No se pudo decodificar el audio recibido"""
+
+
+class TranscripcionService:
+
+    @staticmethod
+    def clave_cache(contenido: bytes, formato: str) -> str:
+        """Hash del audio más la configuración que produjo el texto: un nivel en disco persistente
+        no debe devolver una transcripción de otro motor, idioma o decodificación"""
+        huella = hashlib.sha256(contenido).hexdigest()
+        preprocesado = "pre" if AUDIO_PREPROCESAR else "crudo"
+        return f"{ASR_MOTOR}:{ASR_IDIOMA}:{decodificador_activo()}:{preprocesado}:{formato}:{huella}"
+
+    @staticmethod
+    async def transcribir(contenido: bytes, formato: str = "webm", usar_cache: bool = True) -> str:
+        """Decodificar y transcribir un audio sin bloquear el event loop"""
+        clave = TranscripcionService.clave_cache(contenido, formato) if usar_cache else None
+        if clave is not None:
+            # El nivel en disco (TRANSCRIPCIONES_CACHE_DB) se consulta en un hilo
+            texto = await cache_transcripciones.obtener_async(clave)
+            if texto is not AUSENTE:
+                return texto
+
+        try:
+            audio_data = await ejecutar_en_pool(
+                pool_decodificacion(), AudioService.decodificar, contenido, formato=formato
+            )
+        except AudioDemasiadoLargoError:
+            raise
+        except AudioSinVozError as e:
+            # Sin voz no hay nada que reconocer: se evita la llamada al motor
+            raise sr.UnknownValueError() from e
+        except Exception as e:
+            raise ErrorConversionAudio(f"Error al convertir el audio: {str(e)}") from e
+
+        # Transcribir con el motor configurado (google, vosk o falso)
+        texto = await ejecutar_en_pool(pool_asr(), obtener_motor().transcribir, audio_data)
+
+        if clave is not None:
+            await cache_transcripciones.guardar_async(clave, texto)
+        return texto
@@ -0,0 +1,152 @@
+# servicios/voz_service.py
+import os
+import re
+import time
+import uuid
+import hashlib
+import threading
+from concurrent.futures import Future, TimeoutError as TiempoAgotado
+from typing import Dict, Optional
+from funciones.voz import trabajador_voz, VOZ_ID
+
+# Caché en disco de respuestas sintetizadas para reproducirlas en el navegador
+# (bajo el directorio de la aplicación, no del directorio de trabajo)
+DIRECTORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VOZ_CACHE_DIR = os.getenv("VOZ_CACHE_DIR", os.path.join(DIRECTORIO_APP, "cache", "voz"))
+VOZ_CACHE_MAX_ARCHIVOS = int(os.getenv("VOZ_CACHE_MAX_ARCHIVOS", 500))
+VOZ_CACHE_MAX_MB = float(os.getenv("VOZ_CACHE_MAX_MB", 100))
+VOZ_SINTESIS_TIMEOUT = float(os.getenv("VOZ_SINTESIS_TIMEOUT", 10))
+# Segundos que se reservan, dentro del límite del comando, para devolver el resultado
+MARGEN_RESPUESTA = 0.5
+
+NOMBRE_VALIDO = re.compile(r"^[0-9a-f]{64}\.wav$")
+# Síntesis en curso: <hash>.<aleatorio>.tmp.wav (no coincide con NOMBRE_VALIDO, nunca se sirve)
+SUFIJO_TEMPORAL = ".tmp.wav"
+
+
+class VozService:
+
+    _lock = threading.Lock()
+    _lock_sintesis = threading.Lock()
+    _en_curso: Dict[str, Future] = {}
+
+    @staticmethod
+    def nombre_archivo(texto: str, voz: str = VOZ_ID) -> str:
+        """Nombre del archivo en caché: hash del texto y de la voz usada"""
+        return hashlib.sha256(f"{voz}\n{texto}".encode("utf-8")).hexdigest() + ".wav"
+
+    @staticmethod
+    def ruta_archivo(nombre: str) -> Optional[str]:
+        """Ruta de un archivo de la caché (None si el nombre no es válido o no existe)"""
+        if not NOMBRE_VALIDO.match(nombre):
+            return None
+        ruta = os.path.join(VOZ_CACHE_DIR, nombre)
+        return ruta if os.path.exists(ruta) else None
+
+    @staticmethod
+    def obtener_url(texto: str, limite: Optional[float] = None) -> Optional[str]:
+        """URL del audio sintetizado para el texto, generándolo si no está en caché.
+
+        limite (time.monotonic) es el instante en que expira el comando: la espera de la síntesis
+        no lo sobrepasa y, si no termina a tiempo, la respuesta va sin audio (la síntesis sigue y
+        queda en caché para la próxima vez).
+        """
+        nombre = VozService.nombre_archivo(texto)
+        ruta = os.path.join(VOZ_CACHE_DIR, nombre)
+
+        if os.path.exists(ruta):
+            # Actualizar la fecha de uso para la expulsión LRU
+            os.utime(ruta, None)
+            return f"/voz/{nombre}"
+
+        espera = VOZ_SINTESIS_TIMEOUT
+        if limite is not None:
+            espera = min(espera, limite - time.monotonic() - MARGEN_RESPUESTA)
+            if espera <= 0:
+                return None
+
+        try:
+            VozService._sintesis(texto, nombre).result(timeout=espera)
+        except TiempoAgotado:
+            print(f"⚠️  La síntesis no terminó en {espera:.1f} s; la respuesta va sin audio")
+            return None
+        except Exception as e:
+            print(f"⚠️  No se pudo sintetizar la respuesta: {e}")
+            return None
+
+        VozService.expulsar()
+        return f"/voz/{nombre}"
+
+    @staticmethod
+    def _sintesis(texto: str, nombre: str) -> Future:
+        """Futuro de la síntesis de un archivo, compartido por las peticiones simultáneas del mismo texto"""
+        ruta = os.path.join(VOZ_CACHE_DIR, nombre)
+        with VozService._lock_sintesis:
+            futuro = VozService._en_curso.get(nombre)
+            if futuro is not None:
+                return futuro
+            futuro = Future()
+            if os.path.exists(ruta):
+                # Otra petición la terminó entre la comprobación y el lock
+                futuro.set_result(ruta)
+                return futuro
+            VozService._en_curso[nombre] = futuro
+
+        os.makedirs(VOZ_CACHE_DIR, exist_ok=True)
+        temporal = os.path.join(VOZ_CACHE_DIR, f"{nombre[:-4]}.{uuid.uuid4().hex[:8]}{SUFIJO_TEMPORAL}")
+        sintesis = trabajador_voz().sintetizar(texto, temporal)
+        # Se publica al terminar aunque quien la pidió ya no espere (timeout)
+        sintesis.add_done_callback(lambda hecho: VozService._publicar(nombre, temporal, ruta, hecho, futuro))
+        return futuro
+
+    @staticmethod
+    def _publicar(nombre: str, temporal: str, ruta: str, sintesis: Future, futuro: Future):
+        """Mover el audio terminado a su nombre definitivo: nunca se sirve un wav a medio escribir"""
+        error = None
+        try:
+            sintesis.result()
+            os.replace(temporal, ruta)
+        except Exception as e:
+            error = e
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+
+        with VozService._lock_sintesis:
+            VozService._en_curso.pop(nombre, None)
+
+        if error is None:
+            futuro.set_result(ruta)
+        else:
+            futuro.set_exception(error)
+
+    @staticmethod
+    def expulsar():
+        """Borrar los archivos usados hace más tiempo si se superan los límites"""
+        with VozService._lock:
+            archivos = []
+            limite_temporales = time.time() - VOZ_SINTESIS_TIMEOUT * 6
+            for entrada in os.scandir(VOZ_CACHE_DIR):
+                if entrada.is_file() and entrada.name.endswith(SUFIJO_TEMPORAL):
+                    # Restos de síntesis interrumpidas (p. ej. un reinicio a mitad)
+                    if entrada.stat().st_mtime < limite_temporales:
+                        try:
+                            os.remove(entrada.path)
+                        except OSError:
+                            pass
+                elif entrada.is_file() and NOMBRE_VALIDO.match(entrada.name):
+                    info = entrada.stat()
+                    archivos.append((info.st_mtime, info.st_size, entrada.path))
+
+            archivos.sort()
+            total_bytes = sum(tamano for _, tamano, _ in archivos)
+            max_bytes = VOZ_CACHE_MAX_MB * 1024 * 1024
+
+            while archivos and (len(archivos) > VOZ_CACHE_MAX_ARCHIVOS or total_bytes > max_bytes):
+                _, tamano, ruta = archivos.pop(0)
+                try:
+                    os.remove(ruta)
+                    total_bytes -= tamano
+                except OSError:
+                    pass
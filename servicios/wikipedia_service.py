@@ -0,0 +1,91 @@
+# servicios/wikipedia_service.py
+import os
+import re
+import asyncio
+import unicodedata
+from servicios.cache_service import CacheDosNiveles, AUSENTE
+
+# Caché de consultas a Wikipedia (memoria LRU + SQLite en disco, abierto en el primer uso)
+DIRECTORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WIKIPEDIA_CACHE_MAX = int(os.getenv("WIKIPEDIA_CACHE_MAX", 512))
+WIKIPEDIA_CACHE_DB = os.getenv("WIKIPEDIA_CACHE_DB", os.path.join(DIRECTORIO_APP, "cache", "wikipedia.db"))
+WIKIPEDIA_CACHE_TTL = float(os.getenv("WIKIPEDIA_CACHE_TTL", 24 * 3600))
+WIKIPEDIA_CACHE_TTL_NEGATIVO = float(os.getenv("WIKIPEDIA_CACHE_TTL_NEGATIVO", 3600))
+
+cache_wikipedia = CacheDosNiveles(
+    max_entradas=WIKIPEDIA_CACHE_MAX,
+    ruta_disco=WIKIPEDIA_CACHE_DB or None
+)
+
+_PUNTUACION = re.compile(r"[¿?¡!.,;:\"'()]")
+
+
+class WikipediaNoDisponibleError(Exception):
+    """El cliente HTTP de conocimiento (aiohttp) no está instalado o no se pudo cargar"""
+
+
+class WikipediaService:
+
+    @staticmethod
+    def normalizar(consulta: str) -> str:
+        """Clave de caché: minúsculas, sin puntuación y con espacios simples"""
+        consulta = unicodedata.normalize("NFC", consulta).lower()
+        consulta = _PUNTUACION.sub(" ", consulta)
+        return " ".join(consulta.split())
+
+    @staticmethod
+    def clave(consulta: str, frases: int = 2) -> str:
+        return f"{frases}:{WikipediaService.normalizar(consulta)}"
+
+    @staticmethod
+    def resumen(consulta: str, frases: int = 2) -> dict:
+        """Resumen de Wikipedia con caché de lectura.
+
+        Devuelve {"tipo": "resumen" | "desambiguacion" | "no_encontrado", "texto", "opciones"}.
+        Los resultados negativos se guardan con un TTL más corto; los errores de red no se guardan.
+        """
+        clave = WikipediaService.clave(consulta, frases)
+        resultado = cache_wikipedia.obtener(clave)
+        if resultado is not AUSENTE:
+            return resultado
+
+        resultado = WikipediaService._cliente().resumen(WikipediaService.normalizar(consulta), frases)
+        WikipediaService._guardar(clave, resultado)
+        return resultado
+
+    @staticmethod
+    async def resumen_async(consulta: str, frases: int = 2, especulativa: bool = False) -> dict:
+        """Igual que resumen() desde el event loop; cancelar la tarea aborta la consulta HTTP.
+
+        La caché en disco se lee y escribe en un hilo para no bloquear el loop. Las consultas
+        especulativas (transcripciones parciales) no guardan resultados negativos: "quién es el"
+        no encontrado no debe ocupar la caché compartida.
+        """
+        clave = WikipediaService.clave(consulta, frases)
+        resultado = await cache_wikipedia.obtener_async(clave)
+        if resultado is not AUSENTE:
+            return resultado
+
+        futuro = WikipediaService._cliente().precargar(WikipediaService.normalizar(consulta), frases)
+        resultado = await asyncio.wrap_future(futuro)
+        if not especulativa or resultado["tipo"] == "resumen":
+            await cache_wikipedia.guardar_async(clave, resultado, WikipediaService._ttl(resultado))
+        return resultado
+
+    @staticmethod
+    def _guardar(clave: str, resultado: dict):
+        cache_wikipedia.guardar(clave, resultado, WikipediaService._ttl(resultado))
+
+    @staticmethod
+    def _ttl(resultado: dict) -> float:
+        return WIKIPEDIA_CACHE_TTL if resultado["tipo"] == "resumen" else WIKIPEDIA_CACHE_TTL_NEGATIVO
+
+    @staticmethod
+    def _cliente():
+        try:
+            from servicios.conocimiento_service import cliente_conocimiento
+        except Exception as e:
+            raise WikipediaNoDisponibleError(str(e)) from e
+
+        # Pool de conexiones compartido, timeouts estrictos y consultas idénticas coalescidas
+        return cliente_conocimiento()
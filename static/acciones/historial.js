@@ -16,6 +16,14 @@ class GestorHistorial {
         this.btnBuscar = document.getElementById('btn-buscar');
         this.btnGenerarReporte = document.getElementById('btn-generar-reporte');
         this.listaHistorial = document.getElementById('lista-historial');
+        
+        // Paginación: al hacerse visible el centinela del final se carga la siguiente página
+        this.siguienteCursor = null;
+        this.cargando = false;
+        this.generacion = 0;
+        this.centinela = document.createElement('div');
+        this.centinela.className = 'historial-centinela';
+        this.listaHistorial.after(this.centinela);
     }
 
     configurarEventos() {
@@ -33,6 +41,12 @@ class GestorHistorial {
         });
         
         this.btnGenerarReporte.addEventListener('click', () => this.generarReportePDF());
+        
+        // Scroll infinito
+        this.observador = new IntersectionObserver((entradas) => {
+            if (entradas.some(entrada => entrada.isIntersecting)) this.cargarMas();
+        }, { rootMargin: '200px' });
+        this.observador.observe(this.centinela);
     }
 
     mostrarSeccion(seccion) {
@@ -46,26 +60,67 @@ class GestorHistorial {
     }
 
     async cargarHistorial(busqueda = '') {
+        // Nueva generación: se descartan las páginas que sigan en camino de la lista anterior
+        const generacion = ++this.generacion;
+        this.siguienteCursor = null;
         try {
             const url = busqueda ? `/historial?buscar=${encodeURIComponent(busqueda)}` : '/historial';
             const response = await fetch(url);
             const data = await response.json();
+            if (generacion !== this.generacion) return;
             
+            this.siguienteCursor = data.siguiente_cursor;
             this.mostrarHistorial(data.registros);
+            this.revisarCentinela();
         } catch (error) {
             console.error('Error cargando historial:', error);
             this.listaHistorial.innerHTML = '<div class="sin-registros">Error al cargar el historial</div>';
         }
     }
 
+    async cargarMas() {
+        if (!this.siguienteCursor || this.cargando) return;
+        
+        const generacion = this.generacion;
+        this.cargando = true;
+        try {
+            const response = await fetch(`/historial?cursor=${encodeURIComponent(this.siguienteCursor)}`);
+            const data = await response.json();
+            if (generacion !== this.generacion) return;
+            
+            this.siguienteCursor = data.siguiente_cursor || null;
+            this.listaHistorial.insertAdjacentHTML(
+                'beforeend', (data.registros || []).map(registro => this.renderRegistro(registro)).join('')
+            );
+        } catch (error) {
+            console.error('Error cargando más historial:', error);
+            this.siguienteCursor = null;
+        } finally {
+            this.cargando = false;
+            this.revisarCentinela();
+        }
+    }
+
+    revisarCentinela() {
+        // Si la página no llena la pantalla el centinela sigue visible y no hay un cambio que
+        // notificar: volver a observarlo fuerza una nueva comprobación
+        this.observador.unobserve(this.centinela);
+        this.observador.observe(this.centinela);
+    }
+
     mostrarHistorial(registros) {
         if (!registros || registros.length === 0) {
             this.listaHistorial.innerHTML = '<div class="sin-registros">No hay registros en el historial</div>';
             return;
         }
 
-        this.listaHistorial.innerHTML = registros.map(registro => `
+        this.listaHistorial.innerHTML = registros.map(registro => this.renderRegistro(registro)).join('');
+    }
+
+    renderRegistro(registro) {
+        return `
             <div class="registro-historial" data-id="${registro.id}">
+                ${this.renderFragmentos(registro.fragmentos)}
                 <div class="registro-comando">
                     <div class="comando-label">Usuario:</div>
                     <div class="comando-texto">${this.escapeHtml(registro.comando_usuario)}</div>
@@ -91,7 +146,31 @@ class GestorHistorial {
                     </div>
                 </div>
             </div>
-        `).join('');
+        `;
+    }
+
+    renderFragmentos(fragmentos) {
+        // Solo en resultados de búsqueda: fragmentos con los términos encontrados
+        if (!fragmentos) return '';
+        const partes = [fragmentos.comando_usuario, fragmentos.respuesta_asistente]
+            .filter(fragmento => fragmento && fragmento.includes('\u0002'))
+            .map(fragmento => `<div class="fragmento-texto">${this.resaltar(fragmento)}</div>`);
+        return partes.length ? `<div class="registro-fragmentos">${partes.join('')}</div>` : '';
+    }
+
+    resaltar(fragmento) {
+        // El servidor marca las coincidencias con \u0002 ... \u0003; escapar antes de insertar <mark>
+        return this.escapeHtml(fragmento)
+            .replace(/\u0002/g, '<mark>')
+            .replace(/\u0003/g, '</mark>');
+    }
+
+    agregarRegistro(registro) {
+        // Añadir al inicio un registro recibido por Socket.IO sin recargar todo el historial
+        if (!this.listaHistorial.querySelector('.registro-historial')) {
+            this.listaHistorial.innerHTML = '';
+        }
+        this.listaHistorial.insertAdjacentHTML('afterbegin', this.renderRegistro(registro));
     }
 
     escapeHtml(text) {